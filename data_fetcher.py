@@ -1,51 +1,231 @@
-import os
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
+import threading
+import time
+from types import MappingProxyType
+import httpx
+import ijson
+from cachetools import TTLCache
 
-class MLBDataFetcher:
-    """Fetches real-time MLB data from various sources"""
+YANKEES_TEAM_ID = 147
+
+# ijson prefix of each game object inside a /schedule payload
+SCHEDULE_GAMES_PREFIX = 'dates.item.games.item'
+
+# Stat types requested together in one /people/{id}/stats call
+STATS_BUNDLE_TYPES = 'season,homeAndAway,vsLeft,vsRight'
+
+# Parsed StatsAPI responses, shared by every fetcher in the process. MLB data
+# changes a few times a day at most, so an hour-long TTL is plenty fresh.
+API_CACHE_TTL = 3600
+_api_cache = TTLCache(maxsize=16, ttl=API_CACHE_TTL)
+_api_cache_lock = threading.Lock()
+
+# (connect, read) timeouts for every StatsAPI request, so one slow response
+# can't tie up a worker. Failed GETs are retried with exponential backoff.
+REQUEST_TIMEOUT = (3.05, 10)
+REQUEST_RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=['GET'])
+
+# Ballpark factors for all MLB venues, built once at import and read-only so
+# they can be shared across threads and requests.
+# This would ideally fetch from Baseball Savant or similar source
+# For now, using approximate factors based on your research
+_BALLPARK_FACTORS = MappingProxyType({
+    'Yankee Stadium': 101,
+    'Fenway Park': 96,
+    'Tropicana Field': 92,
+    'Rogers Centre': 95,
+    'Oriole Park at Camden Yards': 105,
+    'Progressive Field': 98,
+    'Guaranteed Rate Field': 100,
+    'Comerica Park': 94,
+    'Kauffman Stadium': 96,
+    'Target Field': 99,
+    'Minute Maid Park': 103,
+    'Angel Stadium': 97,
+    'Oakland Coliseum': 89,
+    'T-Mobile Park': 93,
+    'Globe Life Field': 106,
+    'Coors Field': 112,
+    'Chase Field': 102,
+    'Dodger Stadium': 95,
+    'PETCO Park': 91,
+    'Oracle Park': 88,
+    'American Family Field': 102,
+    'Wrigley Field': 104,
+    'Great American Ball Park': 105,
+    'PNC Park': 96,
+    'Busch Stadium': 97,
+    'Truist Park': 103,
+    'loanDepot park': 95,
+    'Citi Field': 94,
+    'Citizens Bank Park': 107,
+    'Nationals Park': 99,
+    'Sutter Health Park': 113,  # Athletics temporary stadium
+    'Steinbrenner Field': 108  # Rays temporary stadium
+})
+
+# The same factors as float32 multipliers (factor / 100) indexed by venue, plus
+# a trailing neutral slot for venues missing from the table
+_VENUE_TO_IDX = MappingProxyType({name: i for i, name in enumerate(_BALLPARK_FACTORS)})
+_PARK_FACTOR_ARRAY = np.array(list(_BALLPARK_FACTORS.values()) + [100], dtype=np.float32) / 100.0
+_PARK_FACTOR_ARRAY.flags.writeable = False
+
+def _rate(stat: Dict, numer: str = 'homeRuns', denom: str = 'plateAppearances') -> float:
+    """Ratio of two StatsAPI counting stats, 0.0 when the denominator is zero"""
+    n = stat.get(numer, 0)
+    d = stat.get(denom, 0)
+    return n / d if d else 0.0
+
+def _split_stats(stat: Dict) -> Dict:
+    """HR totals and HR/PA for one home/away or handedness split"""
+    return {
+        'home_runs': stat.get('homeRuns', 0),
+        'plate_appearances': stat.get('plateAppearances', 0),
+        'hr_per_pa': _rate(stat)
+    }
+
+class _MLBDataFetcherBase:
+    """Request parameters, parsing, fallbacks and ballpark data shared by both fetchers"""
     
     def __init__(self):
         self.base_url = "https://statsapi.mlb.com/api/v1"
         self.judge_player_id = 592450  # Aaron Judge's MLB player ID
-        
-    def get_current_season_stats(self, player_id: int = None) -> Dict:
-        """Fetch current season stats for Aaron Judge"""
-        if player_id is None:
-            player_id = self.judge_player_id
-            
-        current_year = datetime.now().year
-        url = f"{self.base_url}/people/{player_id}/stats"
-        
-        params = {
-            'stats': 'season',
-            'season': current_year,
+        self._season_year = datetime.now().year
+        self._season_year_checked_at = time.time()
+    
+    @staticmethod
+    def clear_cache():
+        """Drop every cached StatsAPI response so the next call goes upstream"""
+        with _api_cache_lock:
+            _api_cache.clear()
+    
+    def _cache_get(self, key: Tuple):
+        with _api_cache_lock:
+            return _api_cache.get(key)
+    
+    def _cache_put(self, key: Tuple, value):
+        with _api_cache_lock:
+            _api_cache[key] = value
+    
+    @property
+    def season_year(self) -> int:
+        """Current season, re-read from the clock at most once a day"""
+        now = time.time()
+        if now - self._season_year_checked_at > 86400:
+            self._season_year = datetime.now().year
+            self._season_year_checked_at = now
+        return self._season_year
+    
+    def _stats_params(self, stats_type: str) -> Dict:
+        """Query parameters for a /people/{id}/stats request"""
+        return {
+            'stats': stats_type,
+            'season': self.season_year,
             'sportId': 1
         }
+    
+    def _schedule_params(self) -> Dict:
+        """Query parameters for the Yankees /schedule request"""
+        return {
+            'teamId': YANKEES_TEAM_ID,
+            'season': self.season_year,
+            'sportId': 1
+        }
+    
+    def _parse_stats_bundle(self, data: Dict) -> Dict:
+        """Split a multi-type /stats payload into the per-model stat dicts"""
+        by_type = {}
+        for entry in data.get('stats', []):
+            by_type.setdefault(entry.get('type', {}).get('displayName'), []).append(entry)
+        
+        return {
+            'current_stats': self._parse_current_season_stats(by_type.get('season', [])),
+            'home_away_splits': self._parse_home_away_splits(by_type.get('homeAndAway', [])),
+            'pitcher_splits': self._parse_pitcher_handedness_splits(
+                by_type.get('vsLeft', []) + by_type.get('vsRight', [])
+            )
+        }
+    
+    def _parse_current_season_stats(self, stats: List[Dict]) -> Dict:
+        """Extract season totals from the 'season' stat entries"""
+        if len(stats) > 0 and len(stats[0]['splits']) > 0:
+            hitting_stats = stats[0]['splits'][0]['stat']
+            return {
+                'home_runs': hitting_stats.get('homeRuns', 0),
+                'plate_appearances': hitting_stats.get('plateAppearances', 0),
+                'at_bats': hitting_stats.get('atBats', 0),
+                'hits': hitting_stats.get('hits', 0),
+                'games_played': hitting_stats.get('gamesPlayed', 0),
+                'hr_per_pa': _rate(hitting_stats)
+            }
+        return self._current_stats_fallback()
+    
+    def _parse_home_away_splits(self, stats: List[Dict]) -> Dict:
+        """Extract home/away splits from the 'homeAndAway' stat entries"""
+        home_stats = away_stats = {}
         
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        for entry in stats:
+            for split in entry['splits']:
+                stat = split['stat']
+                if split['split']['code'] == 'H':  # Home
+                    home_stats = _split_stats(stat)
+                elif split['split']['code'] == 'A':  # Away
+                    away_stats = _split_stats(stat)
+                    
+        return {'home': home_stats, 'away': away_stats}
+    
+    def _parse_pitcher_handedness_splits(self, stats: List[Dict]) -> Dict:
+        """Extract LHP/RHP splits from the 'vsLeft'/'vsRight' stat entries"""
+        vs_left = vs_right = {}
+        
+        for entry in stats:
+            for split in entry['splits']:
+                stat = split['stat']
+                if 'Left' in split['split']['description']:
+                    vs_left = _split_stats(stat)
+                elif 'Right' in split['split']['description']:
+                    vs_right = _split_stats(stat)
+                    
+        return {'vs_left': vs_left, 'vs_right': vs_right}
+    
+    def _upcoming_games(self, games: Iterable[Dict]) -> Iterator[Dict]:
+        """Reduce raw schedule games to the fields we use, skipping past games"""
+        today = datetime.now().date()
+        venue_to_idx, _ = self.get_ballpark_factor_array()
+        
+        for game in games:
+            game_date = datetime.strptime(game['gameDate'][:10], '%Y-%m-%d').date()
             
-            if 'stats' in data and len(data['stats']) > 0:
-                hitting_stats = data['stats'][0]['splits'][0]['stat']
-                return {
-                    'home_runs': hitting_stats.get('homeRuns', 0),
-                    'plate_appearances': hitting_stats.get('plateAppearances', 0),
-                    'at_bats': hitting_stats.get('atBats', 0),
-                    'hits': hitting_stats.get('hits', 0),
-                    'games_played': hitting_stats.get('gamesPlayed', 0),
-                    'hr_per_pa': hitting_stats.get('homeRuns', 0) / max(hitting_stats.get('plateAppearances', 1), 1)
+            # Only include future games
+            if game_date >= today:
+                venue = game.get('venue', {})
+                home_team = game['teams']['home']['team']
+                yield {
+                    'date': game_date.isoformat(),
+                    'venue_name': venue.get('name', ''),
+                    'venue_id': venue.get('id', 0),
+                    'factor_idx': venue_to_idx.get(venue.get('name', ''), len(venue_to_idx)),
+                    'is_home': home_team['id'] == YANKEES_TEAM_ID,
+                    'opponent': game['teams']['away']['team']['name'] if home_team['id'] == YANKEES_TEAM_ID else home_team['name']
                 }
-        except Exception as e:
-            print(f"Error fetching current stats: {e}")
-            
-        # Return default/placeholder data if API fails
+    
+    def _stats_bundle_fallback(self) -> Dict:
+        """Fallback for every part of the stats bundle when the API fails"""
+        return {
+            'current_stats': self._current_stats_fallback(),
+            'home_away_splits': self._home_away_fallback(),
+            'pitcher_splits': self._pitcher_handedness_fallback()
+        }
+    
+    def _current_stats_fallback(self) -> Dict:
+        """Default/placeholder season stats used when the API fails"""
         return {
             'home_runs': 0,
             'plate_appearances': 0,
@@ -55,195 +235,282 @@ class MLBDataFetcher:
             'hr_per_pa': 0.0824  # 2024 rate as fallback
         }
     
-    def get_home_away_splits(self, player_id: int = None) -> Dict:
-        """Fetch home/away splits for current season"""
-        if player_id is None:
-            player_id = self.judge_player_id
-            
-        current_year = datetime.now().year
-        url = f"{self.base_url}/people/{player_id}/stats"
+    def _home_away_fallback(self) -> Dict:
+        """2024 home/away splits used when the API fails"""
+        return {
+            'home': {
+                'home_runs': 31,
+                'plate_appearances': 341,
+                'hr_per_pa': 0.0909
+            },
+            'away': {
+                'home_runs': 27,
+                'plate_appearances': 363,
+                'hr_per_pa': 0.0744
+            }
+        }
+    
+    def _pitcher_handedness_fallback(self) -> Dict:
+        """2024 LHP/RHP splits used when the API fails"""
+        return {
+            'vs_left': {
+                'home_runs': 16,
+                'plate_appearances': 184,
+                'hr_per_pa': 0.0870
+            },
+            'vs_right': {
+                'home_runs': 42,
+                'plate_appearances': 520,
+                'hr_per_pa': 0.0808
+            }
+        }
+    
+    def get_ballpark_factors(self) -> Mapping[str, float]:
+        """Get ballpark factors for all MLB venues"""
+        return _BALLPARK_FACTORS
+    
+    def get_ballpark_factor_array(self) -> Tuple[Mapping[str, int], np.ndarray]:
+        """Ballpark factors as a float32 multiplier array plus a venue -> index map
         
-        params = {
-            'stats': 'homeAndAway',
-            'season': current_year,
-            'sportId': 1
+        The array has one trailing neutral (1.0) slot, which is the index given
+        to venues missing from the factor table.
+        """
+        return _VENUE_TO_IDX, _PARK_FACTOR_ARRAY
+    
+    def get_schedule_arrays(self, schedule: List[Dict], ballpark_factors: Mapping[str, float] = _BALLPARK_FACTORS,
+                            pa_per_game: float = 4.45) -> Dict[str, np.ndarray]:
+        """Join the schedule with ballpark factors into per-game arrays for the simulator
+        
+        Returns float32 'remaining_pa_by_game' and 'park_factor_by_game' multipliers
+        (factor / 100, 1.0 for venues missing from ``ballpark_factors``), each with
+        one entry per scheduled game. A venue's games get
+        int(games at the venue * pa_per_game) PAs between them, the same totals
+        the ballpark model gives each venue when it aggregates the schedule itself.
+        """
+        venue_names = [game.get('venue_name', 'Unknown') for game in schedule]
+        park_factors = np.array([ballpark_factors.get(venue, 100) for venue in venue_names], dtype=np.float32)
+        
+        # Rank each game among earlier games at its venue; the k-th game gets
+        # floor((k+1)*pa) - floor(k*pa) PAs, so a venue's games sum to int(n*pa)
+        venue_idx = {}
+        game_venues = np.array([venue_idx.setdefault(venue, len(venue_idx)) for venue in venue_names],
+                               dtype=np.intp)
+        order = np.argsort(game_venues, kind='stable')
+        sorted_venues = game_venues[order]
+        rank = np.empty(len(schedule), dtype=np.float64)
+        rank[order] = np.arange(len(schedule)) - np.searchsorted(sorted_venues, sorted_venues)
+        game_pa = np.floor((rank + 1) * pa_per_game) - np.floor(rank * pa_per_game)
+        
+        return {
+            'remaining_pa_by_game': game_pa.astype(np.float32),
+            'park_factor_by_game': park_factors / np.float32(100)
         }
+
+class MLBDataFetcher(_MLBDataFetcherBase):
+    """Fetches real-time MLB data from various sources"""
+    
+    def __init__(self):
+        super().__init__()
         
+        # Reuse one pooled session so repeat calls to statsapi.mlb.com skip the TCP/TLS handshake
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=10,
+            max_retries=REQUEST_RETRY
+        ))
+        self.session.headers.update({'Accept': 'application/json', 'User-Agent': 'judge-hr/1.0'})
+    
+    def close(self):
+        """Close the underlying HTTP session"""
+        self.session.close()
+    
+    def _fetch_cached(self, method_name: str, path: str, params: Dict, parse, player_id: int = None,
+                      stream: bool = False, refresh: bool = False):
+        """GET a StatsAPI path and parse it, serving repeat calls from the TTL cache.
+        
+        With ``stream`` the raw response body is handed to ``parse`` instead of
+        the decoded JSON. ``refresh`` skips the cached copy but still caches the
+        new result. Errors propagate so failures (and their fallbacks) are
+        never cached.
+        """
+        key = (method_name, player_id, params['season'])
+        result = None if refresh else self._cache_get(key)
+        if result is None:
+            url = f"{self.base_url}{path}"
+            if stream:
+                with self.session.get(url, params=params, timeout=REQUEST_TIMEOUT, stream=True) as response:
+                    response.raise_for_status()
+                    response.raw.decode_content = True
+                    result = parse(response.raw)
+            else:
+                response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+                result = parse(response.json())
+            self._cache_put(key, result)
+        return result
+    
+    def fetch_judge_stats_bundle(self, player_id: int = None, refresh: bool = False) -> Dict:
+        """Like get_judge_stats_bundle, but request errors propagate instead of falling back
+        
+        ``refresh`` bypasses (and then replaces) the cached response.
+        """
+        if player_id is None:
+            player_id = self.judge_player_id
+        
+        return self._fetch_cached(
+            'get_judge_stats_bundle', f"/people/{player_id}/stats", self._stats_params(STATS_BUNDLE_TYPES),
+            self._parse_stats_bundle, player_id, refresh=refresh
+        )
+    
+    def get_judge_stats_bundle(self, player_id: int = None) -> Dict:
+        """Fetch season totals, home/away and LHP/RHP splits in one StatsAPI call"""
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            home_stats = away_stats = {}
-            
-            if 'stats' in data and len(data['stats']) > 0:
-                for split in data['stats'][0]['splits']:
-                    stat = split['stat']
-                    if split['split']['code'] == 'H':  # Home
-                        home_stats = {
-                            'home_runs': stat.get('homeRuns', 0),
-                            'plate_appearances': stat.get('plateAppearances', 0),
-                            'hr_per_pa': stat.get('homeRuns', 0) / max(stat.get('plateAppearances', 1), 1)
-                        }
-                    elif split['split']['code'] == 'A':  # Away
-                        away_stats = {
-                            'home_runs': stat.get('homeRuns', 0),
-                            'plate_appearances': stat.get('plateAppearances', 0),
-                            'hr_per_pa': stat.get('homeRuns', 0) / max(stat.get('plateAppearances', 1), 1)
-                        }
-                        
-            return {'home': home_stats, 'away': away_stats}
-            
+            return self.fetch_judge_stats_bundle(player_id)
         except Exception as e:
-            print(f"Error fetching home/away splits: {e}")
-            # Return 2024 data as fallback
-            return {
-                'home': {
-                    'home_runs': 31,
-                    'plate_appearances': 341,
-                    'hr_per_pa': 0.0909
-                },
-                'away': {
-                    'home_runs': 27,
-                    'plate_appearances': 363,
-                    'hr_per_pa': 0.0744
-                }
-            }
+            print(f"Error fetching stats bundle: {e}")
+            return self._stats_bundle_fallback()
+    
+    def get_current_season_stats(self, player_id: int = None) -> Dict:
+        """Fetch current season stats for Aaron Judge"""
+        return self.get_judge_stats_bundle(player_id)['current_stats']
+    
+    def get_home_away_splits(self, player_id: int = None) -> Dict:
+        """Fetch home/away splits for current season"""
+        return self.get_judge_stats_bundle(player_id)['home_away_splits']
     
     def get_pitcher_handedness_splits(self, player_id: int = None) -> Dict:
         """Fetch splits vs LHP/RHP for current season"""
+        return self.get_judge_stats_bundle(player_id)['pitcher_splits']
+    
+    def fetch_yankees_schedule(self, refresh: bool = False) -> List[Dict]:
+        """Like get_yankees_schedule, but request errors propagate instead of falling back
+        
+        ``refresh`` bypasses (and then replaces) the cached response.
+        """
+        return self._fetch_cached(
+            'get_yankees_schedule', "/schedule", self._schedule_params(), self._parse_schedule,
+            stream=True, refresh=refresh
+        )
+    
+    def get_yankees_schedule(self) -> List[Dict]:
+        """Fetch Yankees remaining schedule for the season"""
+        try:
+            return self.fetch_yankees_schedule()
+        except Exception as e:
+            print(f"Error fetching schedule: {e}")
+            return []
+    
+    def _parse_schedule(self, stream) -> List[Dict]:
+        """Extract upcoming games from a streamed /schedule payload"""
+        games = ijson.items(stream, SCHEDULE_GAMES_PREFIX, use_float=True)
+        return list(self._upcoming_games(games))
+
+class AsyncMLBDataFetcher(_MLBDataFetcherBase):
+    """Non-blocking counterpart of MLBDataFetcher built on httpx.AsyncClient"""
+    
+    def __init__(self):
+        super().__init__()
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(REQUEST_TIMEOUT[1], connect=REQUEST_TIMEOUT[0]),
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=REQUEST_RETRY.total,
+                limits=httpx.Limits(max_keepalive_connections=10)
+            ),
+            headers={'Accept': 'application/json', 'User-Agent': 'judge-hr/1.0'}
+        )
+    
+    async def aclose(self):
+        """Close the async HTTP client"""
+        await self.client.aclose()
+    
+    async def _fetch_cached(self, method_name: str, path: str, params: Dict, parse, player_id: int = None,
+                            stream: bool = False, refresh: bool = False):
+        """Async counterpart of MLBDataFetcher._fetch_cached sharing the same TTL cache
+        
+        With ``stream`` the open response is handed to the (async) ``parse``.
+        """
+        key = (method_name, player_id, params['season'])
+        result = None if refresh else self._cache_get(key)
+        if result is None:
+            if stream:
+                async with self.client.stream('GET', path, params=params) as response:
+                    response.raise_for_status()
+                    result = await parse(response)
+            else:
+                response = await self.client.get(path, params=params)
+                response.raise_for_status()
+                result = parse(response.json())
+            self._cache_put(key, result)
+        return result
+    
+    async def _stream_schedule(self, response: httpx.Response) -> List[Dict]:
+        """Push response chunks through ijson, keeping only upcoming games"""
+        games = ijson.sendable_list()
+        parser = ijson.items_coro(games, SCHEDULE_GAMES_PREFIX, use_float=True)
+        schedule = []
+        
+        async for chunk in response.aiter_bytes():
+            parser.send(chunk)
+            schedule.extend(self._upcoming_games(games))
+            del games[:]
+        parser.close()
+        schedule.extend(self._upcoming_games(games))
+        
+        return schedule
+    
+    async def fetch_judge_stats_bundle(self, player_id: int = None, refresh: bool = False) -> Dict:
+        """Like get_judge_stats_bundle, but request errors propagate instead of falling back
+        
+        ``refresh`` bypasses (and then replaces) the cached response.
+        """
         if player_id is None:
             player_id = self.judge_player_id
-            
-        current_year = datetime.now().year
-        url = f"{self.base_url}/people/{player_id}/stats"
-        
-        params = {
-            'stats': 'vsLeft,vsRight',
-            'season': current_year,
-            'sportId': 1
-        }
         
+        return await self._fetch_cached(
+            'get_judge_stats_bundle', f"/people/{player_id}/stats", self._stats_params(STATS_BUNDLE_TYPES),
+            self._parse_stats_bundle, player_id, refresh=refresh
+        )
+    
+    async def get_judge_stats_bundle(self, player_id: int = None) -> Dict:
+        """Fetch season totals, home/away and LHP/RHP splits in one StatsAPI call"""
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            vs_left = vs_right = {}
-            
-            if 'stats' in data and len(data['stats']) > 0:
-                for split in data['stats'][0]['splits']:
-                    stat = split['stat']
-                    if 'Left' in split['split']['description']:
-                        vs_left = {
-                            'home_runs': stat.get('homeRuns', 0),
-                            'plate_appearances': stat.get('plateAppearances', 0),
-                            'hr_per_pa': stat.get('homeRuns', 0) / max(stat.get('plateAppearances', 1), 1)
-                        }
-                    elif 'Right' in split['split']['description']:
-                        vs_right = {
-                            'home_runs': stat.get('homeRuns', 0),
-                            'plate_appearances': stat.get('plateAppearances', 0),
-                            'hr_per_pa': stat.get('homeRuns', 0) / max(stat.get('plateAppearances', 1), 1)
-                        }
-                        
-            return {'vs_left': vs_left, 'vs_right': vs_right}
-            
+            return await self.fetch_judge_stats_bundle(player_id)
         except Exception as e:
-            print(f"Error fetching pitcher handedness splits: {e}")
-            # Return 2024 data as fallback
-            return {
-                'vs_left': {
-                    'home_runs': 16,
-                    'plate_appearances': 184,
-                    'hr_per_pa': 0.0870
-                },
-                'vs_right': {
-                    'home_runs': 42,
-                    'plate_appearances': 520,
-                    'hr_per_pa': 0.0808
-                }
-            }
+            print(f"Error fetching stats bundle: {e}")
+            return self._stats_bundle_fallback()
     
-    def get_yankees_schedule(self) -> List[Dict]:
-        """Fetch Yankees remaining schedule for the season"""
-        current_year = datetime.now().year
-        yankees_team_id = 147
-        
-        url = f"{self.base_url}/schedule"
-        params = {
-            'teamId': yankees_team_id,
-            'season': current_year,
-            'sportId': 1
-        }
+    async def get_current_season_stats(self, player_id: int = None) -> Dict:
+        """Fetch current season stats for Aaron Judge"""
+        return (await self.get_judge_stats_bundle(player_id))['current_stats']
+    
+    async def get_home_away_splits(self, player_id: int = None) -> Dict:
+        """Fetch home/away splits for current season"""
+        return (await self.get_judge_stats_bundle(player_id))['home_away_splits']
+    
+    async def get_pitcher_handedness_splits(self, player_id: int = None) -> Dict:
+        """Fetch splits vs LHP/RHP for current season"""
+        return (await self.get_judge_stats_bundle(player_id))['pitcher_splits']
+    
+    async def fetch_yankees_schedule(self, refresh: bool = False) -> List[Dict]:
+        """Like get_yankees_schedule, but request errors propagate instead of falling back
         
+        ``refresh`` bypasses (and then replaces) the cached response.
+        """
+        return await self._fetch_cached(
+            'get_yankees_schedule', "/schedule", self._schedule_params(), self._stream_schedule,
+            stream=True, refresh=refresh
+        )
+    
+    async def get_yankees_schedule(self) -> List[Dict]:
+        """Fetch Yankees remaining schedule for the season"""
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            schedule = []
-            today = datetime.now().date()
-            
-            for date_entry in data.get('dates', []):
-                for game in date_entry.get('games', []):
-                    game_date = datetime.strptime(game['gameDate'][:10], '%Y-%m-%d').date()
-                    
-                    # Only include future games
-                    if game_date >= today:
-                        venue = game.get('venue', {})
-                        schedule.append({
-                            'date': game_date.isoformat(),
-                            'venue_name': venue.get('name', ''),
-                            'venue_id': venue.get('id', 0),
-                            'is_home': game['teams']['home']['team']['id'] == yankees_team_id,
-                            'opponent': game['teams']['away']['team']['name'] if game['teams']['home']['team']['id'] == yankees_team_id else game['teams']['home']['team']['name']
-                        })
-                        
-            return schedule
-            
+            return await self.fetch_yankees_schedule()
         except Exception as e:
             print(f"Error fetching schedule: {e}")
             return []
-    
-    def get_ballpark_factors(self) -> Dict[str, float]:
-        """Get ballpark factors for all MLB venues"""
-        # This would ideally fetch from Baseball Savant or similar source
-        # For now, using approximate factors based on your research
-        return {
-            'Yankee Stadium': 101,
-            'Fenway Park': 96,
-            'Tropicana Field': 92,
-            'Rogers Centre': 95,
-            'Oriole Park at Camden Yards': 105,
-            'Progressive Field': 98,
-            'Guaranteed Rate Field': 100,
-            'Comerica Park': 94,
-            'Kauffman Stadium': 96,
-            'Target Field': 99,
-            'Minute Maid Park': 103,
-            'Angel Stadium': 97,
-            'Oakland Coliseum': 89,
-            'T-Mobile Park': 93,
-            'Globe Life Field': 106,
-            'Coors Field': 112,
-            'Chase Field': 102,
-            'Dodger Stadium': 95,
-            'PETCO Park': 91,
-            'Oracle Park': 88,
-            'American Family Field': 102,
-            'Wrigley Field': 104,
-            'Great American Ball Park': 105,
-            'PNC Park': 96,
-            'Busch Stadium': 97,
-            'Truist Park': 103,
-            'loanDepot park': 95,
-            'Citi Field': 94,
-            'Citizens Bank Park': 107,
-            'Nationals Park': 99,
-            'Sutter Health Park': 113,  # Athletics temporary stadium
-            'Steinbrenner Field': 108  # Rays temporary stadium
-        }
 
 # Example usage and testing
 if __name__ == "__main__":
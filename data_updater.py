@@ -1,91 +1,223 @@
-import schedule
-import time
+import asyncio
 import logging
 from datetime import datetime
-from data_fetcher import MLBDataFetcher
-import json
+from typing import Dict, List, Mapping, Optional
+from data_fetcher import MLBDataFetcher, AsyncMLBDataFetcher, API_CACHE_TTL
+import orjson
+import hashlib
 import os
+import tempfile
+import numpy as np
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('data_updater.log'),
-        logging.StreamHandler()
-    ]
-)
+logger = logging.getLogger(__name__)
+
+# Refresh the snapshot as often as the API responses behind it expire
+UPDATE_INTERVAL_SECONDS = API_CACHE_TTL
+
+# Readers accept a snapshot that missed one refresh, so a slow or failed
+# update doesn't send every request to the live API
+SNAPSHOT_MAX_AGE = 2 * UPDATE_INTERVAL_SECONDS
+
+# Per-game simulator inputs saved as <name>.npy next to the JSON snapshot
+GAME_ARRAY_NAMES = ('remaining_pa_by_game', 'park_factor_by_game')
 
 class DataUpdater:
     """Handles automatic data updates and caching"""
     
-    def __init__(self, cache_dir: str = "cache"):
+    def __init__(self, cache_dir: str = "cache", data_fetcher: Optional[MLBDataFetcher] = None,
+                 async_data_fetcher: Optional[AsyncMLBDataFetcher] = None):
+        if data_fetcher is not None and not isinstance(data_fetcher, MLBDataFetcher):
+            raise TypeError(f"data_fetcher must be an MLBDataFetcher, not {type(data_fetcher).__name__}")
+        
         self.cache_dir = cache_dir
-        self.data_fetcher = MLBDataFetcher()
+        self.data_fetcher = data_fetcher or MLBDataFetcher()
+        self.async_data_fetcher = async_data_fetcher  # Used by the periodic async updates
+        self._cached_data = None  # In-memory copy of the latest snapshot
+        self._snapshot_digest = None  # Hash of the data last written to disk
+        self._game_arrays = None  # Per-game arrays joined from the snapshot's schedule
         
         # Create cache directory if it doesn't exist
         os.makedirs(cache_dir, exist_ok=True)
         
-    def update_all_data(self):
-        """Update all MLB data and cache results"""
+    def update_all_data(self, refresh: bool = False) -> bool:
+        """Update all MLB data and cache results
+        
+        With ``refresh`` the API responses are re-fetched even if still cached.
+        Returns whether the update succeeded; on failure the previous snapshot
+        and cached responses are kept.
+        """
         try:
-            logging.info("Starting data update...")
+            logger.info("Starting data update...")
             
-            # Fetch all data
-            current_stats = self.data_fetcher.get_current_season_stats()
-            home_away_splits = self.data_fetcher.get_home_away_splits()
-            pitcher_splits = self.data_fetcher.get_pitcher_handedness_splits()
-            schedule = self.data_fetcher.get_yankees_schedule()
-            ballpark_factors = self.data_fetcher.get_ballpark_factors()
+            # Fetch all data; a failed request skips the update rather than
+            # snapshotting the fetcher's fallback values
+            stats_bundle = self.data_fetcher.fetch_judge_stats_bundle(refresh=refresh)
+            schedule = self.data_fetcher.fetch_yankees_schedule(refresh=refresh)
             
-            # Cache the data
-            cache_data = {
-                'current_stats': current_stats,
-                'home_away_splits': home_away_splits,
-                'pitcher_splits': pitcher_splits,
-                'schedule': schedule,
-                'ballpark_factors': ballpark_factors,
-                'last_updated': datetime.now().isoformat()
-            }
+            self._save_snapshot(stats_bundle, schedule, self.data_fetcher.get_ballpark_factors())
+            return True
             
-            # Save to cache file
-            cache_file = os.path.join(self.cache_dir, 'mlb_data.json')
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+        except Exception as e:
+            logger.error(f"Error updating data: {str(e)}")
+            return False
+    
+    async def update_all_data_async(self) -> bool:
+        """Update all MLB data through the async fetcher and cache results
+        
+        Returns whether the update succeeded.
+        """
+        try:
+            logger.info("Starting data update...")
             
-            logging.info(f"Data update completed successfully. Stats: {current_stats['home_runs']} HRs in {current_stats['games_played']} games")
+            # Fetch the stats bundle and schedule concurrently, without fallbacks
+            stats_bundle, schedule = await asyncio.gather(
+                self.async_data_fetcher.fetch_judge_stats_bundle(),
+                self.async_data_fetcher.fetch_yankees_schedule()
+            )
+            
+            await asyncio.to_thread(
+                self._save_snapshot, stats_bundle, schedule, self.async_data_fetcher.get_ballpark_factors()
+            )
+            return True
             
         except Exception as e:
-            logging.error(f"Error updating data: {str(e)}")
+            logger.error(f"Error updating data: {str(e)}")
+            return False
     
-    def load_cached_data(self):
-        """Load data from cache if available"""
-        cache_file = os.path.join(self.cache_dir, 'mlb_data.json')
+    def _save_snapshot(self, stats_bundle: Dict, schedule: List[Dict], ballpark_factors: Mapping[str, float]):
+        """Write fetched data to the cache file and keep it in memory"""
+        current_stats = stats_bundle['current_stats']
+        
+        # Cache the data
+        cache_data = {
+            'current_stats': current_stats,
+            'home_away_splits': stats_bundle['home_away_splits'],
+            'pitcher_splits': stats_bundle['pitcher_splits'],
+            'schedule': schedule,
+            'ballpark_factors': dict(ballpark_factors),
+            'last_updated': datetime.now().isoformat()
+        }
+        
+        # Skip the disk write when nothing but the timestamp changed
+        data = {key: value for key, value in cache_data.items() if key != 'last_updated'}
+        digest = hashlib.blake2b(
+            orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_SORT_KEYS), digest_size=16
+        ).hexdigest()
+        
+        # Join schedule and park factors once here instead of on every simulation
+        game_arrays = self.data_fetcher.get_schedule_arrays(schedule, ballpark_factors)
+        
+        if digest != self._snapshot_digest:
+            for name, array in game_arrays.items():
+                self._write_atomically(f'{name}.npy', lambda f, array=array: np.save(f, array))
+            # JSON last, so a snapshot on disk always has its arrays beside it
+            self._write_atomically('mlb_data.json', lambda f: f.write(
+                orjson.dumps(cache_data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2)
+            ))
+            self._snapshot_digest = digest
         
-        if os.path.exists(cache_file):
+        self._cached_data = cache_data
+        self._game_arrays = game_arrays
+        
+        logger.info(f"Data update completed successfully. Stats: {current_stats['home_runs']} HRs in {current_stats['games_played']} games")
+    
+    def _write_atomically(self, filename: str, write):
+        """Write a cache file via a temp file so readers never see a partial write
+        
+        Each call gets its own temp file, so workers saving the same snapshot
+        at once don't rename each other's files out from under them.
+        """
+        cache_file = os.path.join(self.cache_dir, filename)
+        fd, tmp_file = tempfile.mkstemp(dir=self.cache_dir, prefix=filename + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, cache_file)
+        except BaseException:
+            os.unlink(tmp_file)
+            raise
+    
+    def load_cached_data(self, max_age: Optional[float] = None) -> Optional[Dict]:
+        """Load data from cache if available
+        
+        The snapshot is kept in memory after the first read, so repeated calls
+        don't touch the disk. Snapshots older than ``max_age`` seconds are
+        treated as missing.
+        """
+        if self._cached_data is None:
+            cache_file = os.path.join(self.cache_dir, 'mlb_data.json')
+            
+            if os.path.exists(cache_file):
+                try:
+                    with open(cache_file, 'rb') as f:
+                        self._cached_data = orjson.loads(f.read())
+                except Exception as e:
+                    logger.error(f"Error loading cached data: {str(e)}")
+                    return None
+        
+        if self._cached_data is None:
+            return None
+        
+        if max_age is not None:
+            last_updated = datetime.fromisoformat(self._cached_data['last_updated'])
+            if (datetime.now() - last_updated).total_seconds() > max_age:
+                return None
+        
+        return self._cached_data
+    
+    def load_game_arrays(self, max_age: Optional[float] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Load the per-game simulator arrays matching the cached snapshot
+        
+        Returns None whenever load_cached_data would, or if the arrays are missing.
+        """
+        if self.load_cached_data(max_age=max_age) is None:
+            return None
+        
+        if self._game_arrays is None:
             try:
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
+                self._game_arrays = {
+                    name: np.load(os.path.join(self.cache_dir, f'{name}.npy')) for name in GAME_ARRAY_NAMES
+                }
             except Exception as e:
-                logging.error(f"Error loading cached data: {str(e)}")
+                logger.error(f"Error loading cached game arrays: {str(e)}")
                 return None
-        return None
-    
-    def start_scheduler(self):
-        """Start the scheduled data updates"""
-        # Update data every 4 hours during baseball season
-        schedule.every(4).hours.do(self.update_all_data)
         
-        # Initial update
-        self.update_all_data()
+        return self._game_arrays
+    
+    def clear_cache(self):
+        """Forget the in-memory snapshot and every cached API response"""
+        self._cached_data = None
+        self._game_arrays = None
+        self.data_fetcher.clear_cache()
+    
+    async def run_periodic(self, interval: float = UPDATE_INTERVAL_SECONDS):
+        """Update now, then every `interval` seconds until cancelled"""
+        if self.async_data_fetcher is None:
+            self.async_data_fetcher = AsyncMLBDataFetcher()
         
-        logging.info("Data updater scheduler started. Updates every 4 hours.")
+        logger.info(f"Data updater started. Updates every {interval / 3600:g} hours.")
         
         while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+            await self.update_all_data_async()
+            await asyncio.sleep(interval)
+    
+    def start_scheduler(self):
+        """Run the periodic updates in a standalone event loop"""
+        asyncio.run(self.run_periodic())
 
 if __name__ == "__main__":
+    # Configure logging for standalone runs; importers configure their own
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('data_updater.log'),
+            logging.StreamHandler()
+        ]
+    )
+    
     updater = DataUpdater()
     
     # For testing, just run one update
@@ -1,19 +1,27 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import Dict, List, Optional
-import json
+from typing import Callable, Dict, List, Optional
+import orjson
+import hashlib
+import time
 from datetime import datetime
 import asyncio
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
 
-from data_fetcher import MLBDataFetcher
+from data_fetcher import MLBDataFetcher, AsyncMLBDataFetcher
+from data_updater import DataUpdater, SNAPSHOT_MAX_AGE
 from monte_carlo_simulator import MonteCarloSimulator, SimulationResult
 
 app = FastAPI(
     title="Aaron Judge HR Prediction API",
     description="Monte Carlo simulation API for predicting Aaron Judge's home runs",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware for frontend access
@@ -25,9 +33,101 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON payloads (e.g. /simulate/all, raw distributions) for gzip-capable clients
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Initialize components
 data_fetcher = MLBDataFetcher()
+updater = DataUpdater(data_fetcher=data_fetcher)
 simulator = MonteCarloSimulator()
+async_data_fetcher: Optional[AsyncMLBDataFetcher] = None
+update_task: Optional[asyncio.Task] = None
+
+# Runs the five /simulate/all models side by side, each on its own child RNG
+model_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="simulate")
+
+# Blocking MLB fetches run apart from the default executor that cached_simulation
+# uses, so fetches stuck retrying during an outage can't starve the simulations
+fetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mlb-fetch")
+
+@app.on_event("startup")
+async def startup_event():
+    """Create the shared async MLB client and start periodic data updates"""
+    global async_data_fetcher, update_task
+    async_data_fetcher = AsyncMLBDataFetcher()
+    updater.async_data_fetcher = async_data_fetcher
+    update_task = asyncio.create_task(updater.run_periodic())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop data updates and release pooled HTTP connections on shutdown"""
+    if update_task is not None:
+        update_task.cancel()
+    model_executor.shutdown(wait=False)
+    fetch_executor.shutdown(wait=False)
+    data_fetcher.close()
+    if async_data_fetcher is not None:
+        await async_data_fetcher.aclose()
+
+@lru_cache(maxsize=1)
+def _iso_timestamp(second: int) -> str:
+    return datetime.fromtimestamp(second).isoformat()
+
+def now_iso() -> str:
+    """Current time as an ISO string, formatted at most once per second"""
+    return _iso_timestamp(int(time.time()))
+
+@lru_cache(maxsize=8)
+def get_simulator(trials: int) -> MonteCarloSimulator:
+    """Reuse one simulator per trial count across requests
+    
+    Simulators keep no sampling state between calls; each call reseeds its own
+    generator, so results don't depend on request history or on the worker.
+    """
+    return MonteCarloSimulator(num_trials=trials)
+
+# Simulation results keyed on (model, trials, digest of the model inputs), so
+# identical dashboard requests within the TTL skip the Monte Carlo entirely
+SIMULATION_CACHE_TTL = 600
+simulation_cache = TTLCache(maxsize=128, ttl=SIMULATION_CACHE_TTL)
+
+def stats_digest(inputs) -> str:
+    """Short, order-independent hash of the data a simulation runs on"""
+    # default=dict covers the read-only ballpark factor mapping
+    payload = orjson.dumps(inputs, default=dict, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+async def cached_simulation(model: str, trials: int, inputs, run: Callable):
+    """Return the cached result for these inputs, running the simulation on a miss
+    
+    The simulation runs in a worker thread (NumPy releases the GIL while sampling)
+    so it doesn't stall other requests on the event loop.
+    """
+    key = f"sim:{model}:{trials}:{stats_digest(inputs)}"
+    result = simulation_cache.get(key)
+    if result is None:
+        result = await asyncio.to_thread(run)
+        simulation_cache[key] = result
+    return result
+
+# Longest a request waits on a live MLB fetch. The blocking fetch itself can run
+# on (up to ~55 s with REQUEST_RETRY) after it's abandoned, inside fetch_executor.
+FETCH_TIMEOUT = 12
+
+async def run_fetch(fetch: Callable, *args, **kwargs):
+    """Run a blocking MLB fetch on fetch_executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(fetch_executor, partial(fetch, *args, **kwargs))
+
+async def load_or_fetch(key: str, fetch: Callable):
+    """Serve `key` from the DataUpdater snapshot, falling back to a live fetch on a miss
+    
+    The blocking fetch runs on fetch_executor and is abandoned after FETCH_TIMEOUT seconds.
+    """
+    snapshot = updater.load_cached_data(max_age=SNAPSHOT_MAX_AGE)
+    if snapshot is not None and key in snapshot:
+        return snapshot[key]
+    return await asyncio.wait_for(run_fetch(fetch), timeout=FETCH_TIMEOUT)
 
 # Pydantic models for API responses
 class CurrentStats(BaseModel):
@@ -73,25 +173,25 @@ async def root():
         "message": "Aaron Judge HR Prediction API",
         "version": "1.0.0",
         "documentation": "/docs",
-        "current_date": datetime.now().isoformat()
+        "current_date": now_iso()
     }
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {"status": "healthy", "timestamp": now_iso()}
 
 @app.get("/current-stats", response_model=CurrentStats)
 async def get_current_stats():
     """Get Aaron Judge's current season statistics"""
     try:
-        stats = data_fetcher.get_current_season_stats()
+        stats = await load_or_fetch('current_stats', data_fetcher.get_current_season_stats)
         return CurrentStats(
             home_runs=stats['home_runs'],
             plate_appearances=stats['plate_appearances'],
             games_played=stats['games_played'],
             hr_per_pa=stats['hr_per_pa'],
-            last_updated=datetime.now().isoformat()
+            last_updated=now_iso()
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching current stats: {str(e)}")
@@ -100,11 +200,11 @@ async def get_current_stats():
 async def get_home_away_splits():
     """Get Aaron Judge's home/away performance splits"""
     try:
-        splits = data_fetcher.get_home_away_splits()
+        splits = await load_or_fetch('home_away_splits', data_fetcher.get_home_away_splits)
         return {
             "home": splits['home'],
             "away": splits['away'],
-            "last_updated": datetime.now().isoformat()
+            "last_updated": now_iso()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching home/away splits: {str(e)}")
@@ -113,11 +213,11 @@ async def get_home_away_splits():
 async def get_pitcher_splits():
     """Get Aaron Judge's performance vs LHP/RHP"""
     try:
-        splits = data_fetcher.get_pitcher_handedness_splits()
+        splits = await load_or_fetch('pitcher_splits', data_fetcher.get_pitcher_handedness_splits)
         return {
             "vs_left": splits['vs_left'],
             "vs_right": splits['vs_right'],
-            "last_updated": datetime.now().isoformat()
+            "last_updated": now_iso()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching pitcher splits: {str(e)}")
@@ -126,7 +226,7 @@ async def get_pitcher_splits():
 async def get_remaining_schedule():
     """Get Yankees remaining schedule for the season"""
     try:
-        schedule = data_fetcher.get_yankees_schedule()
+        schedule = await load_or_fetch('schedule', data_fetcher.get_yankees_schedule)
         return [
             ScheduleGame(
                 date=game['date'],
@@ -143,7 +243,7 @@ async def get_remaining_schedule():
 async def get_ballpark_factors():
     """Get ballpark factors for all MLB venues"""
     try:
-        factors = data_fetcher.get_ballpark_factors()
+        factors = await load_or_fetch('ballpark_factors', data_fetcher.get_ballpark_factors)
         return BallparkFactorsResponse(
             factors=factors,
             yankee_stadium_factor=factors.get('Yankee Stadium', 101)
@@ -155,11 +255,13 @@ async def get_ballpark_factors():
 async def simulate_basic_model(trials: int = 2500):
     """Run basic Monte Carlo simulation"""
     try:
-        current_stats = data_fetcher.get_current_season_stats()
+        current_stats = await load_or_fetch('current_stats', data_fetcher.get_current_season_stats)
         hr_per_pa = current_stats.get('hr_per_pa', 0.0824)
         
-        simulator_instance = MonteCarloSimulator(num_trials=trials)
-        result = simulator_instance.basic_model(hr_per_pa)
+        simulator_instance = get_simulator(trials)
+        result = await cached_simulation(
+            "basic", trials, current_stats, lambda: simulator_instance.basic_model(hr_per_pa)
+        )
         
         return {
             "model": "basic",
@@ -177,7 +279,7 @@ async def simulate_basic_model(trials: int = 2500):
                 "percentile_5": result.percentile_5,
                 "percentile_95": result.percentile_95
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error running basic simulation: {str(e)}")
@@ -186,17 +288,36 @@ async def simulate_basic_model(trials: int = 2500):
 async def simulate_all_models(trials: int = 2500):
     """Run all Monte Carlo simulation models"""
     try:
-        # Fetch all required data
-        current_stats = data_fetcher.get_current_season_stats()
-        home_away_splits = data_fetcher.get_home_away_splits()
-        pitcher_splits = data_fetcher.get_pitcher_handedness_splits()
-        schedule = data_fetcher.get_yankees_schedule()
-        ballpark_factors = data_fetcher.get_ballpark_factors()
+        snapshot = updater.load_cached_data(max_age=SNAPSHOT_MAX_AGE)
+        if snapshot is not None:
+            current_stats = snapshot['current_stats']
+            home_away_splits = snapshot['home_away_splits']
+            pitcher_splits = snapshot['pitcher_splits']
+            schedule = snapshot['schedule']
+            ballpark_factors = snapshot['ballpark_factors']
+            game_arrays = updater.load_game_arrays(max_age=SNAPSHOT_MAX_AGE)
+        else:
+            # Fetch the stats bundle and schedule concurrently
+            stats_bundle, schedule = await asyncio.wait_for(asyncio.gather(
+                async_data_fetcher.get_judge_stats_bundle(),
+                async_data_fetcher.get_yankees_schedule()
+            ), timeout=FETCH_TIMEOUT)
+            current_stats = stats_bundle['current_stats']
+            home_away_splits = stats_bundle['home_away_splits']
+            pitcher_splits = stats_bundle['pitcher_splits']
+            ballpark_factors = async_data_fetcher.get_ballpark_factors()
+            game_arrays = None
         
         # Run simulations
-        simulator_instance = MonteCarloSimulator(num_trials=trials)
-        results = simulator_instance.run_all_models(
-            current_stats, home_away_splits, pitcher_splits, schedule, ballpark_factors
+        simulator_instance = get_simulator(trials)
+        inputs = [current_stats, home_away_splits, pitcher_splits, schedule, ballpark_factors]
+        _, park_factor_array = data_fetcher.get_ballpark_factor_array()
+        results = await cached_simulation(
+            "all", trials, inputs,
+            lambda: simulator_instance.run_all_models(
+                *inputs, park_factor_array=park_factor_array, game_arrays=game_arrays,
+                executor=model_executor
+            )
         )
         
         # Convert results to response format
@@ -218,13 +339,13 @@ async def simulate_all_models(trials: int = 2500):
             pitcher_handedness=result_to_response(results['pitcher_handedness']),
             ballpark_factors=result_to_response(results['ballpark_factors']),
             advanced_combined=result_to_response(results['advanced_combined']),
-            last_updated=datetime.now().isoformat(),
+            last_updated=now_iso(),
             current_stats=CurrentStats(
                 home_runs=current_stats['home_runs'],
                 plate_appearances=current_stats['plate_appearances'],
                 games_played=current_stats['games_played'],
                 hr_per_pa=current_stats['hr_per_pa'],
-                last_updated=datetime.now().isoformat()
+                last_updated=now_iso()
             )
         )
         
@@ -232,62 +353,112 @@ async def simulate_all_models(trials: int = 2500):
         raise HTTPException(status_code=500, detail=f"Error running all simulations: {str(e)}")
 
 @app.get("/simulate/distribution/{model}")
-async def get_simulation_distribution(model: str, trials: int = 2500):
-    """Get the full distribution from a specific simulation model"""
+async def get_simulation_distribution(model: str, trials: int = 2500,
+                                      output_format: str = Query("histogram", alias="format")):
+    """Get the distribution from a specific simulation model
+    
+    Returns per-total histogram counts by default; pass ?format=raw for every trial's result.
+    """
     try:
-        current_stats = data_fetcher.get_current_season_stats()
-        simulator_instance = MonteCarloSimulator(num_trials=trials)
+        current_stats = await load_or_fetch('current_stats', data_fetcher.get_current_season_stats)
+        simulator_instance = get_simulator(trials)
         
         if model == "basic":
-            result = simulator_instance.basic_model(current_stats.get('hr_per_pa', 0.0824))
+            result = await cached_simulation(
+                "basic:distribution", trials, current_stats,
+                lambda: simulator_instance.basic_model(
+                    current_stats.get('hr_per_pa', 0.0824), keep_distribution=True
+                )
+            )
         elif model == "home_away":
-            splits = data_fetcher.get_home_away_splits()
-            result = simulator_instance.home_away_model(
-                splits['home'].get('hr_per_pa', 0.0909),
-                splits['away'].get('hr_per_pa', 0.0744)
+            splits = await load_or_fetch('home_away_splits', data_fetcher.get_home_away_splits)
+            result = await cached_simulation(
+                "home_away:distribution", trials, splits,
+                lambda: simulator_instance.home_away_model(
+                    splits['home'].get('hr_per_pa', 0.0909),
+                    splits['away'].get('hr_per_pa', 0.0744), keep_distribution=True
+                )
             )
         elif model == "pitcher_handedness":
-            splits = data_fetcher.get_pitcher_handedness_splits()
-            result = simulator_instance.pitcher_handedness_model(
-                splits['vs_left'].get('hr_per_pa', 0.0870),
-                splits['vs_right'].get('hr_per_pa', 0.0808)
+            splits = await load_or_fetch('pitcher_splits', data_fetcher.get_pitcher_handedness_splits)
+            result = await cached_simulation(
+                "pitcher_handedness:distribution", trials, splits,
+                lambda: simulator_instance.pitcher_handedness_model(
+                    splits['vs_left'].get('hr_per_pa', 0.0870),
+                    splits['vs_right'].get('hr_per_pa', 0.0808), keep_distribution=True
+                )
             )
         elif model == "ballpark_factors":
-            schedule = data_fetcher.get_yankees_schedule()
-            ballpark_factors = data_fetcher.get_ballpark_factors()
-            result = simulator_instance.ballpark_factor_model(
-                schedule, ballpark_factors, current_stats.get('hr_per_pa', 0.0824)
-            )
+            schedule = await load_or_fetch('schedule', data_fetcher.get_yankees_schedule)
+            ballpark_factors = await load_or_fetch('ballpark_factors', data_fetcher.get_ballpark_factors)
+            inputs = [schedule, ballpark_factors, current_stats]
+            _, park_factor_array = data_fetcher.get_ballpark_factor_array()
+            game_arrays = updater.load_game_arrays(max_age=SNAPSHOT_MAX_AGE)
+            hr_per_pa = current_stats.get('hr_per_pa', 0.0824)
+            if game_arrays is not None:
+                result = await cached_simulation(
+                    "ballpark_factors:distribution", trials, inputs,
+                    lambda: simulator_instance.ballpark_factor_model_from_arrays(
+                        game_arrays, hr_per_pa, keep_distribution=True
+                    )
+                )
+            else:
+                result = await cached_simulation(
+                    "ballpark_factors:distribution", trials, inputs,
+                    lambda: simulator_instance.ballpark_factor_model(
+                        schedule, ballpark_factors, hr_per_pa,
+                        park_factor_array=park_factor_array, keep_distribution=True
+                    )
+                )
         else:
             raise HTTPException(status_code=400, detail=f"Unknown model: {model}")
         
-        return {
+        if output_format == "raw":
+            distribution = {"distribution": result.distribution}
+        else:
+            bins, counts = result.histogram
+            distribution = {"bins": bins, "counts": counts}
+        
+        # Returned as a response so orjson serializes the numpy arrays directly
+        return ORJSONResponse({
             "model": model,
-            "distribution": result.distribution,
+            **distribution,
             "statistics": {
                 "mean": result.mean_hrs,
                 "median": result.median_hrs,
                 "std": result.std_hrs
             },
             "trials": trials,
-            "timestamp": datetime.now().isoformat()
-        }
+            "timestamp": now_iso()
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting distribution: {str(e)}")
 
 @app.post("/refresh-data")
 async def refresh_all_data():
-    """Refresh all cached data from MLB APIs"""
+    """Refresh all cached data from MLB APIs
+    
+    Cached responses are only replaced once the new fetch succeeds, so a failed
+    refresh during an API outage keeps serving the previous data.
+    """
     try:
-        # This could implement caching logic in the future
-        return {
-            "message": "Data refresh completed",
-            "timestamp": datetime.now().isoformat()
-        }
+        refreshed = await run_fetch(updater.update_all_data, refresh=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error refreshing data: {str(e)}")
+    
+    if not refreshed:
+        raise HTTPException(status_code=502, detail="Error refreshing data: MLB API request failed")
+    
+    simulation_cache.clear()
+    return {
+        "message": "Data refresh completed",
+        "timestamp": now_iso()
+    }
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # One worker per core; caches, HTTP clients and simulators are per-process
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=os.cpu_count(),
+                loop="uvloop", http="httptools")
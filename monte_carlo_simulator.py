@@ -1,8 +1,37 @@
 import numpy as np
-from scipy import stats
-from typing import Dict, List, Tuple
-import json
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import Executor
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+# Per-trial home run totals fit easily in 16 bits; the smaller dtype keeps large
+# trial counts cache-resident through the statistics and histogram passes
+HR_DTYPE = np.int16
+
+# HR totals reported as P(> threshold). Kept in HR_DTYPE so searchsorted compares
+# against the sorted results directly instead of upcasting a copy of them.
+PROB_THRESHOLDS = np.array([40, 50, 60], dtype=HR_DTYPE)
+PROB_THRESHOLDS.flags.writeable = False
+
+@lru_cache(maxsize=8)
+def _aggregate_schedule(games: Tuple[Tuple[str, float], ...],
+                        pa_per_game: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Collapse (venue name, park multiplier) per game into one entry per venue
+    
+    Returns read-only arrays of each venue's multiplier and plate appearances,
+    int(games at the venue * pa_per_game). Cached because the same schedule is
+    simulated until the next data refresh.
+    """
+    # Number the venues in first-seen order and count each one's games with
+    # bincount; the per-game lookups run through dict/map in C, not a Python loop
+    venue_idx = {game: i for i, game in enumerate(dict.fromkeys(games))}
+    game_idx = np.fromiter(map(venue_idx.__getitem__, games), dtype=np.intp, count=len(games))
+    pa = (np.bincount(game_idx, minlength=len(venue_idx)) * pa_per_game).astype(np.int64)
+    
+    factors = np.fromiter((factor for _, factor in venue_idx), dtype=np.float64, count=len(venue_idx))
+    for array in (factors, pa):
+        array.flags.writeable = False
+    return factors, pa
 
 @dataclass
 class SimulationResult:
@@ -15,16 +44,38 @@ class SimulationResult:
     prob_over_60: float
     percentile_5: float
     percentile_95: float
-    distribution: List[int]
+    distribution: Optional[np.ndarray] = None  # HR_DTYPE total per trial, if kept
+    
+    @cached_property
+    def histogram(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Count of trials at each home run total, as (bins, counts) starting at 0
+        
+        Requires a result created with keep_distribution=True.
+        """
+        if self.distribution is None:
+            raise ValueError("histogram requires a result simulated with keep_distribution=True")
+        counts = np.bincount(self.distribution, minlength=81)
+        return np.arange(counts.size), counts
 
 class MonteCarloSimulator:
     """Monte Carlo simulation engine for Aaron Judge home run predictions"""
     
-    def __init__(self, num_trials: int = 2500):
+    def __init__(self, num_trials: int = 2500, seed: int = 42):
         self.num_trials = num_trials
-        np.random.seed(42)  # For reproducible results
+        # Each call draws from a fresh PCG64 generator seeded here, so the same inputs
+        # always give the same results no matter how often a (shared, cached)
+        # simulator has been used. Draws differ from the old global np.random.seed
+        # stream for the same seed.
+        self.seed = seed
+    
+    def _new_rng(self) -> np.random.Generator:
+        """Fresh generator from the simulator's seed, for a call that wasn't given one"""
+        return np.random.default_rng(self.seed)
     
-    def basic_model(self, hr_per_pa: float, min_pa: int = 600, max_pa: int = 700) -> SimulationResult:
+    def basic_model(self, hr_per_pa: float, min_pa: int = 600, max_pa: int = 700,
+                    rng: Optional[np.random.Generator] = None,
+                    keep_distribution: bool = False,
+                    total_pa: Optional[np.ndarray] = None) -> SimulationResult:
         """
         Basic Monte Carlo model using overall HR/PA rate
         
@@ -32,21 +83,28 @@ class MonteCarloSimulator:
             hr_per_pa: Home runs per plate appearance rate
             min_pa: Minimum plate appearances (uniform distribution)
             max_pa: Maximum plate appearances (uniform distribution)
+            rng: Generator to draw from (defaults to a fresh one from the simulator's seed)
+            keep_distribution: Keep every trial's total on the result (needed for plots/histograms)
+            total_pa: Pre-drawn per-trial PA totals on [min_pa, max_pa), e.g. shared
+                across models by run_all_models; drawn from rng when omitted
         """
-        results = []
+        rng = self._new_rng() if rng is None else rng
         
-        for _ in range(self.num_trials):
-            # Generate random number of plate appearances
-            pa = np.random.uniform(min_pa, max_pa)
-            
-            # Simulate home runs using binomial distribution
-            home_runs = np.random.binomial(int(pa), hr_per_pa)
-            results.append(home_runs)
+        # Generate random number of plate appearances for every trial at once
+        if total_pa is None:
+            total_pa = rng.uniform(min_pa, max_pa, size=self.num_trials)
+        pa = total_pa.astype(np.int64)
         
-        return self._calculate_statistics(results)
+        # Simulate home runs using binomial distribution
+        results = rng.binomial(pa, hr_per_pa).astype(HR_DTYPE)
+        
+        return self._calculate_statistics(results, keep_distribution)
     
     def home_away_model(self, home_hr_per_pa: float, away_hr_per_pa: float, 
-                       min_pa: int = 600, max_pa: int = 700) -> SimulationResult:
+                       min_pa: int = 600, max_pa: int = 700,
+                       rng: Optional[np.random.Generator] = None,
+                       keep_distribution: bool = False,
+                       total_pa: Optional[np.ndarray] = None) -> SimulationResult:
         """
         Monte Carlo model splitting home and away performance
         
@@ -55,29 +113,33 @@ class MonteCarloSimulator:
             away_hr_per_pa: Home runs per PA at away games
             min_pa: Minimum total plate appearances
             max_pa: Maximum total plate appearances
+            rng: Generator to draw from (defaults to a fresh one from the simulator's seed)
+            keep_distribution: Keep every trial's total on the result (needed for plots/histograms)
+            total_pa: Pre-drawn per-trial PA totals on [min_pa, max_pa), e.g. shared
+                across models by run_all_models; drawn from rng when omitted
         """
-        results = []
-        
-        for _ in range(self.num_trials):
-            # Generate random total plate appearances
-            total_pa = np.random.uniform(min_pa, max_pa)
-            
-            # Split roughly 50/50 between home and away
-            home_pa = int(np.ceil(total_pa / 2))
-            away_pa = int(np.floor(total_pa / 2))
-            
-            # Simulate home runs for each scenario
-            home_hrs = np.random.binomial(home_pa, home_hr_per_pa)
-            away_hrs = np.random.binomial(away_pa, away_hr_per_pa)
-            
-            total_hrs = home_hrs + away_hrs
-            results.append(total_hrs)
-        
-        return self._calculate_statistics(results)
+        rng = self._new_rng() if rng is None else rng
+        
+        # Generate random total plate appearances for every trial at once
+        if total_pa is None:
+            total_pa = rng.uniform(min_pa, max_pa, size=self.num_trials)
+        
+        # Split roughly 50/50 between home and away
+        home_pa = np.ceil(total_pa / 2).astype(np.int64)
+        away_pa = np.floor(total_pa / 2).astype(np.int64)
+        
+        # Simulate home runs for each scenario
+        home_hrs = rng.binomial(home_pa, home_hr_per_pa)
+        away_hrs = rng.binomial(away_pa, away_hr_per_pa)
+        
+        return self._calculate_statistics((home_hrs + away_hrs).astype(HR_DTYPE), keep_distribution)
     
     def pitcher_handedness_model(self, vs_left_hr_per_pa: float, vs_right_hr_per_pa: float,
                                 min_pa: int = 600, max_pa: int = 700,
-                                min_rhp_pct: float = 0.70, max_rhp_pct: float = 0.80) -> SimulationResult:
+                                min_rhp_pct: float = 0.70, max_rhp_pct: float = 0.80,
+                                rng: Optional[np.random.Generator] = None,
+                                keep_distribution: bool = False,
+                                total_pa: Optional[np.ndarray] = None) -> SimulationResult:
         """
         Monte Carlo model accounting for pitcher handedness
         
@@ -88,32 +150,36 @@ class MonteCarloSimulator:
             max_pa: Maximum total plate appearances
             min_rhp_pct: Minimum percentage of PAs vs RHP
             max_rhp_pct: Maximum percentage of PAs vs RHP
+            rng: Generator to draw from (defaults to a fresh one from the simulator's seed)
+            keep_distribution: Keep every trial's total on the result (needed for plots/histograms)
+            total_pa: Pre-drawn per-trial PA totals on [min_pa, max_pa), e.g. shared
+                across models by run_all_models; drawn from rng when omitted
         """
-        results = []
-        
-        for _ in range(self.num_trials):
-            # Generate random total plate appearances
-            total_pa = np.random.uniform(min_pa, max_pa)
-            
-            # Generate random percentage of PAs vs RHP
-            rhp_pct = np.random.uniform(min_rhp_pct, max_rhp_pct)
-            
-            # Calculate PAs vs each handedness
-            vs_right_pa = int(total_pa * rhp_pct)
-            vs_left_pa = int(total_pa * (1 - rhp_pct))
-            
-            # Simulate home runs vs each handedness
-            vs_right_hrs = np.random.binomial(vs_right_pa, vs_right_hr_per_pa)
-            vs_left_hrs = np.random.binomial(vs_left_pa, vs_left_hr_per_pa)
-            
-            total_hrs = vs_right_hrs + vs_left_hrs
-            results.append(total_hrs)
-        
-        return self._calculate_statistics(results)
+        rng = self._new_rng() if rng is None else rng
+        
+        # Generate random total plate appearances for every trial at once
+        if total_pa is None:
+            total_pa = rng.uniform(min_pa, max_pa, size=self.num_trials)
+        
+        # Generate random percentage of PAs vs RHP
+        rhp_pct = rng.uniform(min_rhp_pct, max_rhp_pct, size=self.num_trials)
+        
+        # Calculate PAs vs each handedness
+        vs_right_pa = (total_pa * rhp_pct).astype(np.int64)
+        vs_left_pa = (total_pa * (1 - rhp_pct)).astype(np.int64)
+        
+        # Simulate home runs vs each handedness
+        vs_right_hrs = rng.binomial(vs_right_pa, vs_right_hr_per_pa)
+        vs_left_hrs = rng.binomial(vs_left_pa, vs_left_hr_per_pa)
+        
+        return self._calculate_statistics((vs_right_hrs + vs_left_hrs).astype(HR_DTYPE), keep_distribution)
     
     def ballpark_factor_model(self, schedule: List[Dict], ballpark_factors: Dict[str, float],
                              base_hr_per_pa: float, yankee_stadium_factor: float = 101,
-                             pa_per_game: float = 4.45) -> SimulationResult:
+                             pa_per_game: float = 4.45,
+                             park_factor_array: Optional[np.ndarray] = None,
+                             rng: Optional[np.random.Generator] = None,
+                             keep_distribution: bool = False) -> SimulationResult:
         """
         Monte Carlo model incorporating ballpark factors
         
@@ -123,43 +189,69 @@ class MonteCarloSimulator:
             base_hr_per_pa: Base HR/PA rate (typically overall season rate)
             yankee_stadium_factor: Yankee Stadium park factor (baseline)
             pa_per_game: Average plate appearances per game
+            park_factor_array: Optional park multipliers (factor / 100) indexed by each
+                game's 'factor_idx', as built by MLBDataFetcher.get_ballpark_factor_array
+            rng: Generator to draw from (defaults to a fresh one from the simulator's seed)
+            keep_distribution: Keep every trial's total on the result (needed for plots/histograms)
         """
-        results = []
-        
-        # Calculate games at each ballpark
-        ballpark_games = {}
-        for game in schedule:
-            venue = game.get('venue_name', 'Unknown')
-            ballpark_games[venue] = ballpark_games.get(venue, 0) + 1
-        
-        for _ in range(self.num_trials):
-            total_hrs = 0
-            
-            for venue, num_games in ballpark_games.items():
-                # Get ballpark factor, default to 100 if not found
-                park_factor = ballpark_factors.get(venue, 100)
-                
-                # Adjust HR/PA rate based on park factor relative to Yankee Stadium
-                adjusted_hr_per_pa = base_hr_per_pa * (park_factor / yankee_stadium_factor)
-                
-                # Calculate expected PAs for this venue
-                venue_pa = int(num_games * pa_per_game)
-                
-                # Simulate home runs at this venue
-                venue_hrs = np.random.binomial(venue_pa, adjusted_hr_per_pa)
-                total_hrs += venue_hrs
-            
-            results.append(total_hrs)
-        
-        return self._calculate_statistics(results)
+        # Park multiplier for every game
+        if park_factor_array is not None and all('factor_idx' in game for game in schedule):
+            game_factors = park_factor_array[[game['factor_idx'] for game in schedule]].tolist()
+        else:
+            game_factors = [ballpark_factors.get(game.get('venue_name', 'Unknown'), 100) / 100.0
+                            for game in schedule]
+        venues = (game.get('venue_name', 'Unknown') for game in schedule)
+        factors, venue_pa = _aggregate_schedule(tuple(zip(venues, game_factors)), pa_per_game)
+        
+        return self._simulate_parks(factors, venue_pa, base_hr_per_pa, yankee_stadium_factor,
+                                    rng, keep_distribution)
+    
+    def ballpark_factor_model_from_arrays(self, game_arrays: Dict[str, np.ndarray],
+                                          base_hr_per_pa: float, yankee_stadium_factor: float = 101,
+                                          rng: Optional[np.random.Generator] = None,
+                                          keep_distribution: bool = False) -> SimulationResult:
+        """
+        ballpark_factor_model on per-game arrays precomputed by
+        MLBDataFetcher.get_schedule_arrays, which already fix the schedule, park
+        factors and plate appearances per game
+        
+        Args:
+            game_arrays: 'remaining_pa_by_game' and 'park_factor_by_game' arrays
+            base_hr_per_pa: Base HR/PA rate (typically overall season rate)
+            yankee_stadium_factor: Yankee Stadium park factor (baseline)
+            rng: Generator to draw from (defaults to a fresh one from the simulator's seed)
+            keep_distribution: Keep every trial's total on the result (needed for plots/histograms)
+        """
+        return self._simulate_parks(game_arrays['park_factor_by_game'], game_arrays['remaining_pa_by_game'],
+                                    base_hr_per_pa, yankee_stadium_factor, rng, keep_distribution)
+    
+    def _simulate_parks(self, factors: np.ndarray, venue_pa: np.ndarray, base_hr_per_pa: float,
+                        yankee_stadium_factor: float, rng: Optional[np.random.Generator],
+                        keep_distribution: bool) -> SimulationResult:
+        """Draw each trial's HR total over parks with the given multipliers and PAs"""
+        rng = self._new_rng() if rng is None else rng
+        
+        # Adjust HR/PA rate based on park factor relative to Yankee Stadium
+        rates = base_hr_per_pa * factors / (yankee_stadium_factor / 100.0)
+        
+        # Venues at the same rate sum to one binomial, so draw a trials x rates
+        # matrix in one call rather than one column per venue or game
+        venue_rates, venue_idx = np.unique(rates, return_inverse=True)
+        venue_pa = np.bincount(venue_idx, weights=venue_pa, minlength=venue_rates.size).astype(np.int64)
+        results = rng.binomial(venue_pa, venue_rates,
+                               size=(self.num_trials, venue_rates.size)).sum(axis=1, dtype=HR_DTYPE)
+        
+        return self._calculate_statistics(results, keep_distribution)
     
     def advanced_combined_model(self, current_stats: Dict, home_away_splits: Dict,
                                pitcher_splits: Dict, schedule: List[Dict],
-                               ballpark_factors: Dict[str, float]) -> SimulationResult:
+                               ballpark_factors: Dict[str, float],
+                               rng: Optional[np.random.Generator] = None,
+                               keep_distribution: bool = False) -> SimulationResult:
         """
         Advanced model combining multiple factors with current season adjustments
         """
-        results = []
+        rng = self._new_rng() if rng is None else rng
         games_played = current_stats.get('games_played', 0)
         games_remaining = 162 - games_played
         
@@ -168,43 +260,67 @@ class MonteCarloSimulator:
         if current_pa_per_game == 0:
             current_pa_per_game = 4.45  # Use historical average
         
-        for _ in range(self.num_trials):
-            total_hrs = current_stats.get('home_runs', 0)  # Start with current HRs
-            
-            # Simulate remaining games
-            remaining_pa = int(games_remaining * current_pa_per_game * np.random.uniform(0.9, 1.1))
-            
-            # Use current season rates if available, otherwise fall back to historical
-            current_hr_per_pa = current_stats.get('hr_per_pa', 0.0824)
-            
-            # Simple simulation for remaining season
-            remaining_hrs = np.random.binomial(remaining_pa, current_hr_per_pa)
-            total_hrs += remaining_hrs
-            
-            results.append(total_hrs)
-        
-        return self._calculate_statistics(results)
+        # Use current season rates if available, otherwise fall back to historical
+        current_hr_per_pa = current_stats.get('hr_per_pa', 0.0824)
+        
+        # Simulate the remaining games of every trial at once, starting from current HRs
+        remaining_pa = (games_remaining * current_pa_per_game
+                        * rng.uniform(0.9, 1.1, size=self.num_trials)).astype(np.int64)
+        results = (current_stats.get('home_runs', 0)
+                   + rng.binomial(remaining_pa, current_hr_per_pa)).astype(HR_DTYPE)
+        
+        return self._calculate_statistics(results, keep_distribution)
     
-    def _calculate_statistics(self, results: List[int]) -> SimulationResult:
-        """Calculate comprehensive statistics from simulation results"""
-        results_array = np.array(results)
+    def _calculate_statistics(self, results: np.ndarray, keep_distribution: bool = False) -> SimulationResult:
+        """Calculate comprehensive statistics from an array of per-trial HR totals
+        
+        The per-trial results are only kept on the result when ``keep_distribution``
+        is set; summary-only callers don't carry (or serialize) the whole array.
+        """
+        # One sort serves every order statistic: the quantiles (linearly interpolated,
+        # like np.percentile) and the share of trials above each threshold
+        sorted_results = np.sort(results)
+        n = sorted_results.size
+        
+        pos = np.array([0.05, 0.5, 0.95]) * (n - 1)
+        lo = pos.astype(np.intp)
+        hi = np.minimum(lo + 1, n - 1)
+        percentile_5, median, percentile_95 = (
+            sorted_results[lo] + (pos - lo) * (sorted_results[hi] - sorted_results[lo])
+        )
+        prob_over_40, prob_over_50, prob_over_60 = (
+            (n - np.searchsorted(sorted_results, PROB_THRESHOLDS, side='right')) / n
+        )
         
         return SimulationResult(
-            mean_hrs=float(np.mean(results_array)),
-            median_hrs=float(np.median(results_array)),
-            std_hrs=float(np.std(results_array)),
-            prob_over_40=float(np.mean(results_array > 40)),
-            prob_over_50=float(np.mean(results_array > 50)),
-            prob_over_60=float(np.mean(results_array > 60)),
-            percentile_5=float(np.percentile(results_array, 5)),
-            percentile_95=float(np.percentile(results_array, 95)),
-            distribution=results
+            mean_hrs=float(np.mean(sorted_results)),
+            median_hrs=float(median),
+            std_hrs=float(np.std(sorted_results)),
+            prob_over_40=float(prob_over_40),
+            prob_over_50=float(prob_over_50),
+            prob_over_60=float(prob_over_60),
+            percentile_5=float(percentile_5),
+            percentile_95=float(percentile_95),
+            distribution=results if keep_distribution else None
         )
     
     def run_all_models(self, current_stats: Dict, home_away_splits: Dict,
                       pitcher_splits: Dict, schedule: List[Dict],
-                      ballpark_factors: Dict[str, float]) -> Dict[str, SimulationResult]:
-        """Run all simulation models and return comprehensive results"""
+                      ballpark_factors: Dict[str, float],
+                      park_factor_array: Optional[np.ndarray] = None,
+                      game_arrays: Optional[Dict[str, np.ndarray]] = None,
+                      executor: Optional[Executor] = None,
+                      keep_distribution: bool = False) -> Dict[str, SimulationResult]:
+        """Run all simulation models and return comprehensive results
+        
+        Each model draws from its own child generator, spawned from a fresh generator
+        on the simulator's seed, so repeat calls agree and the models are independent.
+        They run in parallel when an ``executor`` (thread or process pool) is given,
+        otherwise in turn on this thread.
+        Pass ``keep_distribution`` when the per-trial results will be plotted, and
+        ``game_arrays`` (built from this same schedule and ballpark_factors) to run
+        the ballpark model on them instead of re-aggregating the schedule.
+        """
         
         # Extract rates, use fallbacks if current season data not available
         overall_rate = current_stats.get('hr_per_pa', 0.0824)
@@ -215,15 +331,45 @@ class MonteCarloSimulator:
         vs_left_rate = pitcher_splits.get('vs_left', {}).get('hr_per_pa', 0.0870)
         vs_right_rate = pitcher_splits.get('vs_right', {}).get('hr_per_pa', 0.0808)
         
-        return {
-            'basic': self.basic_model(overall_rate),
-            'home_away': self.home_away_model(home_rate, away_rate),
-            'pitcher_handedness': self.pitcher_handedness_model(vs_left_rate, vs_right_rate),
-            'ballpark_factors': self.ballpark_factor_model(schedule, ballpark_factors, overall_rate),
-            'advanced_combined': self.advanced_combined_model(
-                current_stats, home_away_splits, pitcher_splits, schedule, ballpark_factors
+        # Plain dict so the arguments stay picklable for process pools
+        ballpark_factors = dict(ballpark_factors)
+        
+        # One stream for the season PA totals shared by the PA-based models (common
+        # random numbers, so their differences reflect the rates), one per model
+        pa_rng, *model_rngs = self._new_rng().spawn(6)
+        total_pa = pa_rng.uniform(600, 700, size=self.num_trials)
+        total_pa.flags.writeable = False
+        
+        models = {
+            'basic': (self.basic_model, (overall_rate,), {'total_pa': total_pa}),
+            'home_away': (self.home_away_model, (home_rate, away_rate), {'total_pa': total_pa}),
+            'pitcher_handedness': (
+                self.pitcher_handedness_model, (vs_left_rate, vs_right_rate), {'total_pa': total_pa}
+            ),
+            'ballpark_factors': (
+                self.ballpark_factor_model, (schedule, ballpark_factors, overall_rate),
+                {'park_factor_array': park_factor_array}
+            ) if game_arrays is None else (
+                self.ballpark_factor_model_from_arrays, (game_arrays, overall_rate), {}
+            ),
+            'advanced_combined': (
+                self.advanced_combined_model,
+                (current_stats, home_away_splits, pitcher_splits, schedule, ballpark_factors), {}
             )
         }
+        rngs = dict(zip(models, model_rngs))
+        
+        if executor is None:
+            return {
+                name: model(*args, rng=rngs[name], keep_distribution=keep_distribution, **kwargs)
+                for name, (model, args, kwargs) in models.items()
+            }
+        
+        futures = {
+            name: executor.submit(model, *args, rng=rngs[name], keep_distribution=keep_distribution, **kwargs)
+            for name, (model, args, kwargs) in models.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
 
 # Example usage
 if __name__ == "__main__":
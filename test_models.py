@@ -1,12 +1,22 @@
 import unittest
 import sys
 import os
+import io
+import json
+import tempfile
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest import mock
+
+import numpy as np
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from monte_carlo_simulator import MonteCarloSimulator, SimulationResult
-from data_fetcher import MLBDataFetcher
+from monte_carlo_simulator import MonteCarloSimulator, SimulationResult, _aggregate_schedule
+from data_fetcher import MLBDataFetcher, AsyncMLBDataFetcher, _rate
+from data_updater import DataUpdater
 
 class TestMonteCarloSimulator(unittest.TestCase):
     """Test cases for Monte Carlo simulation models"""
@@ -17,7 +27,7 @@ class TestMonteCarloSimulator(unittest.TestCase):
         
     def test_basic_model(self):
         """Test basic Monte Carlo model"""
-        result = self.simulator.basic_model(hr_per_pa=0.0824)
+        result = self.simulator.basic_model(hr_per_pa=0.0824, keep_distribution=True)
         
         self.assertIsInstance(result, SimulationResult)
         self.assertGreater(result.mean_hrs, 0)
@@ -32,7 +42,8 @@ class TestMonteCarloSimulator(unittest.TestCase):
         """Test home/away split model"""
         result = self.simulator.home_away_model(
             home_hr_per_pa=0.0909, 
-            away_hr_per_pa=0.0744
+            away_hr_per_pa=0.0744,
+            keep_distribution=True
         )
         
         self.assertIsInstance(result, SimulationResult)
@@ -43,7 +54,8 @@ class TestMonteCarloSimulator(unittest.TestCase):
         """Test pitcher handedness model"""
         result = self.simulator.pitcher_handedness_model(
             vs_left_hr_per_pa=0.0870,
-            vs_right_hr_per_pa=0.0808
+            vs_right_hr_per_pa=0.0808,
+            keep_distribution=True
         )
         
         self.assertIsInstance(result, SimulationResult)
@@ -66,13 +78,92 @@ class TestMonteCarloSimulator(unittest.TestCase):
         result = self.simulator.ballpark_factor_model(
             schedule=schedule,
             ballpark_factors=ballpark_factors,
-            base_hr_per_pa=0.0824
+            base_hr_per_pa=0.0824,
+            keep_distribution=True
         )
         
         self.assertIsInstance(result, SimulationResult)
         self.assertGreater(result.mean_hrs, 0)
         self.assertEqual(len(result.distribution), 100)
     
+    def test_schedule_aggregation_is_cached(self):
+        """Test that a repeated schedule reuses its per-venue aggregation"""
+        schedule = [
+            {'venue_name': 'Yankee Stadium', 'is_home': True},
+            {'venue_name': 'Coors Field', 'is_home': False},
+            {'venue_name': 'Yankee Stadium', 'is_home': True},
+        ]
+        ballpark_factors = {'Yankee Stadium': 101, 'Coors Field': 112}
+        
+        _aggregate_schedule.cache_clear()
+        for _ in range(2):
+            self.simulator.ballpark_factor_model(schedule, ballpark_factors, base_hr_per_pa=0.0824)
+        
+        self.assertEqual(_aggregate_schedule.cache_info().hits, 1)
+        factors, venue_pa = _aggregate_schedule(
+            (('Yankee Stadium', 1.01), ('Coors Field', 1.12), ('Yankee Stadium', 1.01)), 4.45
+        )
+        np.testing.assert_array_equal(factors, [1.01, 1.12])
+        # Each venue's PAs are truncated on their own: int(2 * 4.45) and int(1 * 4.45)
+        np.testing.assert_array_equal(venue_pa, [8, 4])
+    
+    def test_repeat_calls_are_reproducible(self):
+        """Test that a reused simulator carries no sampling state between calls"""
+        first = self.simulator.basic_model(hr_per_pa=0.0824, keep_distribution=True)
+        self.simulator.home_away_model(0.09, 0.07)
+        second = self.simulator.basic_model(hr_per_pa=0.0824, keep_distribution=True)
+        
+        np.testing.assert_array_equal(first.distribution, second.distribution)
+    
+    def test_distribution_dropped_by_default(self):
+        """Test that summary-only results don't carry every trial"""
+        result = self.simulator.basic_model(hr_per_pa=0.0824)
+        
+        self.assertIsNone(result.distribution)
+        self.assertGreater(result.mean_hrs, 30)
+        with self.assertRaisesRegex(ValueError, 'keep_distribution=True'):
+            result.histogram
+    
+    def test_distribution_histogram(self):
+        """Test that the histogram counts every trial at its home run total"""
+        result = self.simulator.basic_model(hr_per_pa=0.0824, keep_distribution=True)
+        bins, counts = result.histogram
+        
+        self.assertEqual(counts.sum(), 100)
+        self.assertEqual(len(bins), len(counts))
+        self.assertEqual(counts[int(result.distribution[0])], (result.distribution == result.distribution[0]).sum())
+    
+    def test_statistics_match_numpy(self):
+        """Test that the sort-based statistics agree with NumPy's reductions"""
+        results = np.random.default_rng(7).binomial(650, 0.0824, size=101)
+        result = self.simulator._calculate_statistics(results, keep_distribution=True)
+        
+        self.assertAlmostEqual(result.median_hrs, np.median(results))
+        self.assertAlmostEqual(result.percentile_5, np.percentile(results, 5))
+        self.assertAlmostEqual(result.percentile_95, np.percentile(results, 95))
+        self.assertEqual(result.prob_over_50, np.mean(results > 50))
+        self.assertAlmostEqual(result.std_hrs, np.std(results))
+        self.assertIs(result.distribution, results)
+    
+    def test_run_all_models_with_executor(self):
+        """Test that running the models on a pool matches running them in turn"""
+        fetcher = MLBDataFetcher()
+        bundle = fetcher._stats_bundle_fallback()
+        schedule = [{'venue_name': 'Yankee Stadium', 'is_home': True}] * 10
+        inputs = (bundle['current_stats'], bundle['home_away_splits'], bundle['pitcher_splits'],
+                  schedule, fetcher.get_ballpark_factors())
+        
+        serial = MonteCarloSimulator(num_trials=100).run_all_models(*inputs, keep_distribution=True)
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            parallel = MonteCarloSimulator(num_trials=100).run_all_models(
+                *inputs, executor=executor, keep_distribution=True
+            )
+        
+        self.assertEqual(serial.keys(), parallel.keys())
+        for name in serial:
+            np.testing.assert_array_equal(serial[name].distribution, parallel[name].distribution)
+        self.assertFalse(np.array_equal(serial['basic'].distribution, serial['home_away'].distribution))
+    
     def test_probability_calculations(self):
         """Test that probability calculations are correct"""
         result = self.simulator.basic_model(hr_per_pa=0.0824)
@@ -133,7 +224,8 @@ class TestMLBDataFetcher(unittest.TestCase):
         """Test ballpark factors"""
         factors = self.fetcher.get_ballpark_factors()
         
-        self.assertIsInstance(factors, dict)
+        self.assertIsInstance(factors, Mapping)
+        self.assertIs(factors, self.fetcher.get_ballpark_factors())  # Built once, shared
         self.assertIn('Yankee Stadium', factors)
         self.assertGreater(len(factors), 25)  # Should have all MLB parks
         
@@ -142,6 +234,167 @@ class TestMLBDataFetcher(unittest.TestCase):
             self.assertGreater(factor, 0)
             self.assertLess(factor, 150)  # Reasonable upper bound
 
+    def test_stats_responses_are_cached(self):
+        """Test that repeat calls are served from the TTL cache"""
+        MLBDataFetcher.clear_cache()
+        response = mock.Mock()
+        response.json.return_value = {
+            'stats': [{
+                'type': {'displayName': 'season'},
+                'splits': [{'stat': {'homeRuns': 30, 'plateAppearances': 400, 'gamesPlayed': 95}}]
+            }]
+        }
+        
+        with mock.patch.object(self.fetcher.session, 'get', return_value=response) as get:
+            first = self.fetcher.get_current_season_stats()
+            second = self.fetcher.get_current_season_stats()
+            self.assertEqual(get.call_count, 1)
+            
+            # A forced refresh re-requests the bundle even though it's cached
+            self.fetcher.fetch_judge_stats_bundle(refresh=True)
+        MLBDataFetcher.clear_cache()
+        
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(first, second)
+        self.assertEqual(first['home_runs'], 30)
+        self.assertAlmostEqual(first['hr_per_pa'], 30 / 400)
+
+    def test_schedule_streaming_skips_past_games(self):
+        """Test that the streamed schedule keeps only upcoming games"""
+        def game(day, venue, home_id):
+            return {'gameDate': f"{day.isoformat()}T23:05:00Z", 'venue': {'id': 1, 'name': venue},
+                    'teams': {'home': {'team': {'id': home_id, 'name': 'Home'}},
+                              'away': {'team': {'id': 111, 'name': 'Away'}}}}
+        
+        today = date.today()
+        payload = {'dates': [
+            {'games': [game(today - timedelta(days=1), 'Fenway Park', 111)]},
+            {'games': [game(today, 'Yankee Stadium', 147), game(today + timedelta(days=1), 'Nowhere', 111)]},
+        ]}
+        
+        schedule = self.fetcher._parse_schedule(io.BytesIO(json.dumps(payload).encode()))
+        
+        self.assertEqual([g['venue_name'] for g in schedule], ['Yankee Stadium', 'Nowhere'])
+        self.assertTrue(schedule[0]['is_home'])
+        self.assertEqual(schedule[1]['opponent'], 'Home')
+        factors = self.fetcher.get_ballpark_factors()
+        self.assertEqual(schedule[0]['factor_idx'], list(factors).index('Yankee Stadium'))
+        self.assertEqual(schedule[1]['factor_idx'], len(factors))
+    
+    def test_rate_handles_zero_denominator(self):
+        """Test the HR/PA helper with and without plate appearances"""
+        self.assertAlmostEqual(_rate({'homeRuns': 10, 'plateAppearances': 125}), 0.08)
+        self.assertEqual(_rate({'homeRuns': 3, 'plateAppearances': 0}), 0.0)
+        self.assertEqual(_rate({}), 0.0)
+    
+    def test_stats_bundle_parsing(self):
+        """Test that one bundled payload is split into all three stat views"""
+        def split(code, description, hrs, pa):
+            return {'split': {'code': code, 'description': description},
+                    'stat': {'homeRuns': hrs, 'plateAppearances': pa}}
+        
+        bundle = self.fetcher._parse_stats_bundle({'stats': [
+            {'type': {'displayName': 'season'}, 'splits': [split('', '', 30, 400)]},
+            {'type': {'displayName': 'homeAndAway'},
+             'splits': [split('H', 'Home', 18, 200), split('A', 'Away', 12, 200)]},
+            {'type': {'displayName': 'vsLeft'}, 'splits': [split('vl', 'vs Left', 8, 100)]},
+            {'type': {'displayName': 'vsRight'}, 'splits': [split('vr', 'vs Right', 22, 300)]},
+        ]})
+        
+        self.assertEqual(bundle['current_stats']['home_runs'], 30)
+        self.assertAlmostEqual(bundle['home_away_splits']['home']['hr_per_pa'], 0.09)
+        self.assertAlmostEqual(bundle['home_away_splits']['away']['hr_per_pa'], 0.06)
+        self.assertAlmostEqual(bundle['pitcher_splits']['vs_left']['hr_per_pa'], 0.08)
+        self.assertEqual(bundle['pitcher_splits']['vs_right']['home_runs'], 22)
+
+class TestDataUpdater(unittest.TestCase):
+    """Test cases for the cached data snapshot"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.updater = DataUpdater(cache_dir=self.cache_dir.name)
+        self.bundle = self.updater.data_fetcher._stats_bundle_fallback()
+        self.cache_file = os.path.join(self.cache_dir.name, 'mlb_data.json')
+    
+    def tearDown(self):
+        self.cache_dir.cleanup()
+    
+    def test_snapshot_written_atomically(self):
+        """Test that the snapshot lands in place with no temp file left behind"""
+        self.updater._save_snapshot(self.bundle, [], {'Yankee Stadium': 101})
+        
+        self.assertEqual(sorted(os.listdir(self.cache_dir.name)),
+                         ['mlb_data.json', 'park_factor_by_game.npy', 'remaining_pa_by_game.npy'])
+        with open(self.cache_file) as f:
+            self.assertEqual(json.load(f)['current_stats'], self.bundle['current_stats'])
+    
+    def test_async_fetcher_rejected_as_sync_fetcher(self):
+        """Test that the async fetcher can't stand in for the blocking one"""
+        self.assertFalse(issubclass(AsyncMLBDataFetcher, MLBDataFetcher))
+        with self.assertRaises(TypeError):
+            DataUpdater(cache_dir=self.cache_dir.name, data_fetcher=AsyncMLBDataFetcher())
+    
+    def test_concurrent_snapshots_dont_collide(self):
+        """Test that workers saving the same snapshot at once all succeed"""
+        updaters = [DataUpdater(cache_dir=self.cache_dir.name, data_fetcher=self.updater.data_fetcher)
+                    for _ in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(updater._save_snapshot, self.bundle, [], {'Yankee Stadium': 101})
+                       for updater in updaters]
+            for future in futures:
+                future.result()
+        
+        self.assertTrue(all(updater.load_cached_data() is not None for updater in updaters))
+        self.assertEqual(len(os.listdir(self.cache_dir.name)), 3)
+    
+    def test_failed_fetch_keeps_fallbacks_out_of_snapshot(self):
+        """Test that an update during an API outage leaves the cache untouched"""
+        fetcher = self.updater.data_fetcher
+        with mock.patch.object(fetcher, '_fetch_cached', side_effect=ConnectionError("API down")):
+            self.assertEqual(fetcher.get_yankees_schedule(), [])
+            self.assertFalse(self.updater.update_all_data(refresh=True))
+        
+        self.assertIsNone(self.updater.load_cached_data())
+        self.assertEqual(os.listdir(self.cache_dir.name), [])
+    
+    def test_unchanged_snapshot_skips_write(self):
+        """Test that an identical update doesn't rewrite the cache file"""
+        self.updater._save_snapshot(self.bundle, [], {'Yankee Stadium': 101})
+        os.utime(self.cache_file, (0, 0))
+        self.updater._save_snapshot(self.bundle, [], {'Yankee Stadium': 101})
+        self.assertEqual(os.path.getmtime(self.cache_file), 0)
+        
+        self.updater._save_snapshot(self.bundle, [], {'Yankee Stadium': 102})
+        self.assertNotEqual(os.path.getmtime(self.cache_file), 0)
+        self.assertEqual(self.updater.load_cached_data()['ballpark_factors'], {'Yankee Stadium': 102})
+
+    def test_game_arrays_saved_with_snapshot(self):
+        """Test that per-game arrays are precomputed and reloadable from disk"""
+        schedule = [
+            {'venue_name': 'Yankee Stadium', 'is_home': True},
+            {'venue_name': 'Coors Field', 'is_home': False},
+            {'venue_name': 'Nowhere', 'is_home': False},
+        ]
+        self.updater._save_snapshot(self.bundle, schedule, self.updater.data_fetcher.get_ballpark_factors())
+        
+        arrays = DataUpdater(cache_dir=self.cache_dir.name).load_game_arrays()
+        
+        np.testing.assert_array_equal(arrays['remaining_pa_by_game'], [4, 4, 4])
+        np.testing.assert_allclose(arrays['park_factor_by_game'], [1.01, 1.12, 1.0], rtol=1e-6)
+        
+        simulator = MonteCarloSimulator(num_trials=100)
+        from_arrays = simulator.ballpark_factor_model_from_arrays(arrays, 0.0824, keep_distribution=True)
+        from_schedule = simulator.ballpark_factor_model(
+            schedule, self.updater.data_fetcher.get_ballpark_factors(), 0.0824, keep_distribution=True
+        )
+        np.testing.assert_array_equal(from_arrays.distribution, from_schedule.distribution)
+        
+        # The arrays follow the factors being snapshotted, not the built-in table
+        self.updater._save_snapshot(self.bundle, schedule, {'Coors Field': 120})
+        np.testing.assert_allclose(self.updater.load_game_arrays()['park_factor_by_game'],
+                                   [1.0, 1.2, 1.0], rtol=1e-6)
+
 def run_tests():
     """Run all tests"""
     unittest.main(verbosity=2)
@@ -1,26 +1,65 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Dict, List, Tuple
-import json
+from typing import Dict, List, Optional
 from monte_carlo_simulator import SimulationResult
 
+def _pyplot():
+    """matplotlib.pyplot, imported on first use so importing this module stays cheap"""
+    import matplotlib.pyplot as plt
+    return plt
+
 class VisualizationGenerator:
     """Generate visualizations for Monte Carlo simulation results"""
     
-    def __init__(self):
+    # Plot style is process-wide, so it's applied by the first instance only
+    _style_applied = False
+    
+    def __init__(self, backend: Optional[str] = 'Agg'):
+        """
+        Args:
+            backend: matplotlib backend selected before pyplot loads. Agg (the default)
+                renders files headlessly without probing for a GUI toolkit, which suits
+                servers and report generation; pass None to keep matplotlib's default
+                when plots should be shown interactively.
+        """
+        import matplotlib
+        if backend is not None:
+            matplotlib.use(backend)
+        plt = _pyplot()
+        import seaborn as sns
+        
+        # Headless backends (Agg, pdf, ...) can only save plots, never show them
+        self._interactive = matplotlib.get_backend().lower() not in matplotlib.rcsetup.non_interactive_bk
+        
         # Set up plotting style
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
+        if not VisualizationGenerator._style_applied:
+            plt.style.use('seaborn-v0_8')
+            sns.set_palette("husl")
+            VisualizationGenerator._style_applied = True
+        
+        # Figure reused for every histogram in generate_report_plots, created on first use
+        self._report_fig = None
+        self._report_ax = None
     
     def plot_distribution_histogram(self, result: SimulationResult, title: str, 
-                                  filename: str = None) -> str:
-        """Create histogram of simulation distribution"""
-        fig, ax = plt.subplots(figsize=(12, 8))
+                                  filename: str = None, ax=None, dpi: int = 300) -> str:
+        """Create histogram of simulation distribution
+        
+        Draws on a new figure, or clears and redraws ``ax`` when one is given.
+        """
+        plt = _pyplot()
+        if ax is None:
+            fig, ax = plt.subplots(figsize=(12, 8))
+            owns_figure = True
+        else:
+            fig = ax.figure
+            ax.clear()
+            owns_figure = False
         
-        # Create histogram
-        n, bins, patches = ax.hist(result.distribution, bins=30, alpha=0.7, 
-                                 density=True, edgecolor='black')
+        # One bar per home run total, from the result's cached integer bincount
+        bins, counts = result.histogram
+        lo, hi = int(result.distribution.min()), int(result.distribution.max())
+        ax.bar(bins[lo:hi + 1], counts[lo:hi + 1] / result.distribution.size, width=1.0,
+               alpha=0.7, edgecolor='black')
         
         # Add vertical lines for key statistics
         ax.axvline(result.mean_hrs, color='red', linestyle='--', linewidth=2, 
@@ -47,20 +86,24 @@ class VisualizationGenerator:
         ax.grid(True, alpha=0.3)
         
         if filename:
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
-            plt.close()
+            fig.savefig(filename, dpi=dpi, bbox_inches='tight')
+            if owns_figure:
+                plt.close(fig)
             return filename
         else:
-            plt.show()
-            return ""
+            return self._show(fig, owns_figure)
     
     def plot_model_comparison(self, results: Dict[str, SimulationResult], 
-                            filename: str = None) -> str:
+                            filename: str = None, dpi: int = 300) -> str:
         """Compare results from different models"""
+        if any(result.distribution is None for result in results.values()):
+            raise ValueError("plot_model_comparison requires results simulated with keep_distribution=True")
+        
+        plt = _pyplot()
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
         
         models = list(results.keys())
-        means = [results[model].mean_hrs for model in models]
+        means = np.fromiter((results[model].mean_hrs for model in models), float, len(models))
         prob_40 = [results[model].prob_over_40 for model in models]
         prob_50 = [results[model].prob_over_50 for model in models]
         prob_60 = [results[model].prob_over_60 for model in models]
@@ -91,10 +134,9 @@ class VisualizationGenerator:
         ax2.legend()
         
         # Confidence intervals
-        conf_low = [results[model].percentile_5 for model in models]
-        conf_high = [results[model].percentile_95 for model in models]
-        errors = [np.array(conf_high) - np.array(means), 
-                 np.array(means) - np.array(conf_low)]
+        conf_low = np.fromiter((results[model].percentile_5 for model in models), float, len(models))
+        conf_high = np.fromiter((results[model].percentile_95 for model in models), float, len(models))
+        errors = np.vstack([means - conf_low, conf_high - means])  # (below, above) the mean
         
         ax3.errorbar(models, means, yerr=errors, fmt='o', capsize=5, capthick=2)
         ax3.set_title('90% Confidence Intervals (5th-95th percentile)')
@@ -113,16 +155,16 @@ class VisualizationGenerator:
         plt.tight_layout()
         
         if filename:
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
-            plt.close()
+            fig.savefig(filename, dpi=dpi, bbox_inches='tight')
+            plt.close(fig)
             return filename
         else:
-            plt.show()
-            return ""
+            return self._show(fig)
     
     def plot_season_progress(self, current_stats: Dict, projections: Dict[str, float],
-                           filename: str = None) -> str:
+                           filename: str = None, dpi: int = 300) -> str:
         """Show season progress vs projections"""
+        plt = _pyplot()
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
         
         games_played = current_stats.get('games_played', 0)
@@ -152,16 +194,19 @@ class VisualizationGenerator:
         current_line = np.linspace(0, current_pace, 162)
         
         ax2.plot(games_x[:games_played], 
-                [current_hrs * (g / games_played) for g in games_x[:games_played]], 
+                current_hrs * games_x[:games_played] / max(games_played, 1), 
                 'ro-', linewidth=3, label='Actual')
         ax2.plot(games_x, current_line, 'r--', alpha=0.5, label='Current Pace')
         
-        # Add projection lines
+        # Add projection lines, all built at once as one row per model running from
+        # today's total at game `games_played` to the projection at game 162
         colors = ['blue', 'green', 'orange', 'purple', 'brown']
+        projection_x = np.arange(games_played, 163)
+        projection_lines = np.linspace(current_hrs, np.asarray(projected_totals, dtype=float),
+                                       games_remaining + 1, axis=-1)
         for i, (model, projection) in enumerate(projections.items()):
             if i < len(colors):
-                projection_line = np.linspace(current_hrs, projection, games_remaining + 1)
-                ax2.plot(games_x[games_played:], projection_line, 
+                ax2.plot(projection_x, projection_lines[i], 
                         color=colors[i], alpha=0.7, label=f'{model}: {projection:.1f}')
         
         ax2.set_title('Season Timeline and Projections')
@@ -173,40 +218,63 @@ class VisualizationGenerator:
         plt.tight_layout()
         
         if filename:
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
-            plt.close()
+            fig.savefig(filename, dpi=dpi, bbox_inches='tight')
+            plt.close(fig)
             return filename
         else:
-            plt.show()
-            return ""
+            return self._show(fig)
+    
+    def _show(self, fig, owns_figure: bool = True) -> str:
+        """Display a plot that wasn't saved to a file
+        
+        Under a headless backend plt.show() does nothing, so the figure is closed
+        (if this generator created it) and a ValueError raised instead.
+        """
+        plt = _pyplot()
+        if not self._interactive:
+            if owns_figure:
+                plt.close(fig)
+            raise ValueError(f"The {plt.get_backend()} backend can't show plots; "
+                             "pass a filename or create VisualizationGenerator(backend=None)")
+        plt.show()
+        return ""
     
     def generate_report_plots(self, results: Dict[str, SimulationResult], 
-                            current_stats: Dict, output_dir: str = "plots") -> List[str]:
-        """Generate all plots for a comprehensive report"""
+                            current_stats: Dict, output_dir: str = "plots", dpi: int = 150) -> List[str]:
+        """Generate all plots for a comprehensive report
+        
+        ``results`` must be run with keep_distribution=True for the histograms.
+        """
         import os
         os.makedirs(output_dir, exist_ok=True)
         
         generated_files = []
         
-        # Individual model histograms
+        # Individual model histograms, all drawn on one reused figure so the
+        # canvas and fonts are set up once rather than per model
+        if self._report_fig is None:
+            from matplotlib.figure import Figure
+            self._report_fig = Figure(figsize=(12, 8))
+            self._report_ax = self._report_fig.add_subplot()
+        
         for model_name, result in results.items():
             filename = f"{output_dir}/{model_name}_distribution.png"
             self.plot_distribution_histogram(
                 result, 
                 f"Aaron Judge HR Prediction - {model_name.replace('_', ' ').title()} Model",
-                filename
+                filename, ax=self._report_ax, dpi=dpi
             )
             generated_files.append(filename)
         
         # Model comparison
         filename = f"{output_dir}/model_comparison.png"
-        self.plot_model_comparison(results, filename)
+        self.plot_model_comparison(results, filename, dpi=dpi)
         generated_files.append(filename)
         
         # Season progress
         projections = {model: result.mean_hrs for model, result in results.items()}
         filename = f"{output_dir}/season_progress.png"
-        self.plot_season_progress(current_stats, projections, filename)
+        self.plot_season_progress(current_stats, projections, filename, dpi=dpi)
         generated_files.append(filename)
         
         return generated_files
@@ -217,7 +285,7 @@ if __name__ == "__main__":
     from monte_carlo_simulator import MonteCarloSimulator
     
     simulator = MonteCarloSimulator(num_trials=1000)
-    result = simulator.basic_model(hr_per_pa=0.0824)
+    result = simulator.basic_model(hr_per_pa=0.0824, keep_distribution=True)
     
-    viz = VisualizationGenerator()
+    viz = VisualizationGenerator(backend=None)  # Shown interactively below
     viz.plot_distribution_histogram(result, "Test Distribution")